@@ -456,15 +456,12 @@ def cams2MiligInput(meteor_list, file_path):
         # Init a new MILIG meteor data container
         milig_meteor = StationData(station_id, meteor.longitude, meteor.latitude, meteor.height)
 
-        # Fill in meteor points
-        for azim, elev, t in zip(meteor.azim_data, meteor.elev_data, meteor.time_data):
+        # Convert +E of due N azimuth to +W of due S
+        milig_meteor.azim_data = (np.array(meteor.azim_data) + np.pi)%(2*np.pi)
 
-            # Convert +E of due N azimuth to +W of due S
-            milig_meteor.azim_data.append((azim + np.pi)%(2*np.pi))
-
-            # Convert elevation angle to zenith angle
-            milig_meteor.zangle_data.append(np.pi/2 - elev)
-            milig_meteor.time_data.append(t)
+        # Convert elevation angle to zenith angle
+        milig_meteor.zangle_data = np.pi/2 - np.array(meteor.elev_data)
+        milig_meteor.time_data = np.array(meteor.time_data, dtype=np.float64)
 
 
         milig_list.append(milig_meteor)
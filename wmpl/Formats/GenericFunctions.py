@@ -323,6 +323,10 @@ def writeMiligInputFileMeteorObservation(jdt_ref, meteor_list, file_path, conver
 
     datetime_obj = jd2Date(jdt_ref, dt_obj=True)
 
+    # Pick line formats, the time of negative picks is written with a sign and one decimal less
+    pick_format_positive = "{:9.5f}{:8.5f}{:3d}{:3d}{:8.6f}\n"
+    pick_format_negative = "{:9.5f}{:8.5f}{:3d}{:3d}{:+8.5f}\n"
+
     with open(file_path, 'w') as f:
 
         datetime_str = datetime_obj.strftime("%Y%m%d%H%M%S.%f")[:16]
@@ -349,25 +353,26 @@ def writeMiligInputFileMeteorObservation(jdt_ref, meteor_list, file_path, conver
                 1.0)
                 )
 
-            # Go through every point in the meteor
-            for i, (azim, elev, t) in enumerate(zip(meteor.azim_data, meteor.elev_data, meteor.time_data)):
+            # Convert all angles to degrees at once (the zenith angle is computed from the elevation angle)
+            azim_deg = np.degrees(np.array(meteor.azim_data)).tolist()
+            zangle_deg = np.degrees(np.pi/2 - np.array(meteor.elev_data)).tolist()
 
-                # Compute the zenith angle from the elevation angle
-                zangle = np.pi/2 - elev
+            # Index of the last point
+            last_i = len(meteor.time_data) - 1
 
-                last_pick = 0
+            # Go through every point in the meteor
+            for i, (azim, zangle, t) in enumerate(zip(azim_deg, zangle_deg, meteor.time_data)):
 
                 # If this is the last point, last_pick is 9
-                if i == len(meteor.time_data) - 1:
-                    last_pick = 9
+                last_pick = 9 if i == last_i else 0
 
                 # Write individual meteor points. If the 4th column is 1, the point will be ignored.
                 if t < 0:
-                    time_format = "{:+8.5f}"
+                    pick_format = pick_format_negative
                 else:
-                    time_format = "{:8.6f}"
-                f.write(("{:9.5f}{:8.5f}{:3d}{:3d}" + time_format + "\n").format(np.degrees(azim), \
-                    np.degrees(zangle), last_pick, 0, t))
+                    pick_format = pick_format_positive
+
+                f.write(pick_format.format(azim, zangle, last_pick, 0, t))
 
         # Flag indicating that the meteor data ends here
         f.write('-1\n')
@@ -3,7 +3,10 @@
 from __future__ import print_function, absolute_import
 
 import os
+import io
 import sys
+import math
+import struct
 import argparse
 
 import numpy as np
@@ -14,6 +17,36 @@ from wmpl.Trajectory.GuralTrajectory import GuralTrajectory
 from wmpl.Utils.TrajConversions import date2JD, jd2Date, jd2LST
 
 
+# Fixed-width columns of the station line: station ID, latitude (deg), longitude (deg), height (km), weight
+MILIG_STATION_STRUCT = struct.Struct('3s10s10s5s5s')
+
+# Widths of the columns in pick lines: azimuth (deg), zenith angle (deg), last pick flag, ignore flag, time (s)
+MILIG_PICK_WIDTHS = (9, 8, 3, 3, 8)
+
+
+def unpackPicks(picks):
+    """ Convert a block of parsed MILIG picks into separate pick data arrays.
+
+    Arguments:
+        picks: [ndarray] (N, 5) array with the pick columns: azimuth +W of due South (deg), zenith angle (deg),
+            last pick flag, ignore flag, time (s).
+
+    Return:
+        (azim_data, zangle_data, ignore_picks, time_data): [tuple of ndarrays] Azimuth and zenith angle in 
+            radians, ignore flags and time in seconds.
+    """
+
+    # Convert the angles to radians
+    azim_data = np.radians(picks[:, 0])
+    zangle_data = np.radians(picks[:, 1])
+
+    ignore_picks = picks[:, 3].astype(np.int64)
+    time_data = picks[:, 4]
+
+    return azim_data, zangle_data, ignore_picks, time_data
+
+
+
 class StationData(object):
     """ Holds information loaded from the MILIG input file. """
 
@@ -24,10 +57,21 @@ class StationData(object):
         self.lat = lat
         self.height = height
 
-        self.time_data = []
-        self.azim_data = []
-        self.zangle_data = []
-        self.ignore_picks = []
+        self.time_data = np.empty(0)
+        self.azim_data = np.empty(0)
+        self.zangle_data = np.empty(0)
+        self.ignore_picks = np.empty(0, dtype=int)
+
+
+    def finalize(self):
+        """ Make sure that all pick data are stored as contiguous numpy arrays, e.g. if they were assigned as 
+            lists. Arrays which are already in the correct format are not copied.
+        """
+
+        self.time_data = np.ascontiguousarray(self.time_data, dtype=np.float64)
+        self.azim_data = np.ascontiguousarray(self.azim_data, dtype=np.float64)
+        self.zangle_data = np.ascontiguousarray(self.zangle_data, dtype=np.float64)
+        self.ignore_picks = np.ascontiguousarray(self.ignore_picks, dtype=int)
 
 
     def __repr__(self):
@@ -43,135 +87,166 @@ class StationData(object):
         out_str += '\n'
         out_str += 'Time (s), Azimuth +W of S (d), Zenith angle (d)\n'
 
-        for time, azim, zangle in zip(self.time_data, self.azim_data, self.zangle_data):
-            out_str += "{:8.6f}, {:19.6f},  {:16.6f}\n".format(time, np.degrees(azim), np.degrees(zangle))
+        # Convert all angles to degrees at once
+        azim_deg = np.degrees(np.asarray(self.azim_data)).tolist()
+        zangle_deg = np.degrees(np.asarray(self.zangle_data)).tolist()
+
+        for time, azim, zangle in zip(self.time_data, azim_deg, zangle_deg):
+            out_str += "{:8.6f}, {:19.6f},  {:16.6f}\n".format(time, azim, zangle)
 
         return out_str
 
 
 
 
-def loadMiligInput(file_path):
+def loadMiligInput(file_path, verbose=False):
     """ Loads MILIG-style input files. 
     
     Arguments:
         file_path: [str] path to the MILIG input file
 
+    Keyword arguments:
+        verbose: [bool] Print out the loaded station coordinates. False by default.
+
     Return:
         [jd, stations]: [list] a list containing loaded info from the MILIG input file
 
     """
 
-    with open(file_path) as f:
+    # Read the whole file at once
+    with open(file_path, 'rb') as f:
+        data = f.read()
 
-        # Set the file pointer to the beginning
-        f.seek(0)
 
-        #-> First line
-        
-        # Fireball date and time - this time is the reference time (t = 0) for all picks
-        fireball_date = f.read(8)
-        fireball_time = f.read(8)
+    #-> First line
+
+    # Header fields are sliced from a view of the data, without copying the whole file
+    header = memoryview(data)
+    
+    # Fireball date and time - this time is the reference time (t = 0) for all picks
+    fireball_date = bytes(header[0:8]).decode()
+    fireball_time = bytes(header[8:16]).decode()
+
+    # Unpack the date and time
+    year, month, date = fireball_date[:4], fireball_date[4:6], fireball_date[6:8]
+    hh, mm, ss = fireball_time[:2], fireball_time[2:4], fireball_time[4:]
+
+    time_list = list(map(float, [year, month, date, hh, mm, ss]))
 
-        # Unpack the date and time
-        year, month, date = fireball_date[:4], fireball_date[4:6], fireball_date[6:8]
-        hh, mm, ss = fireball_time[:2], fireball_time[2:4], fireball_time[4:]
+    # Calculate the reference Julian date
+    jdt_ref = date2JD(*time_list)
 
-        time_list = list(map(float, [year, month, date, hh, mm, ss]))
+    # Greenwich Sidereal Time in degrees (NOT USED)
+    gst = float(bytes(header[16:26]).decode())
 
-        # Calculate the reference Julian date
-        jdt_ref = date2JD(*time_list)
+    # Convergation control factor (NOT USED)
+    ccf = bytes(header[26:36]).decode()
 
-        # Greenwich Sidereal Time in degrees (NOT USED)
-        gst = float(f.read(10))
+    # Split the rest of the file after the first line into lines
+    eol = data.find(b'\n')
+    if eol < 0:
+        lines = []
 
-        # Convergation control factor (NOT USED)
-        ccf = f.read(10)
+    else:
+        lines = data[eol + 1:].splitlines()
+
+
+    stations = []
 
-        f.readline()
+    # Raw pick lines and their line numbers in the file, grouped per station
+    station_picks = []
+    station_pick_numbers = []
 
-        stations = []
-        stat_ind = 0
+    # Flag indicating that the next line to be read is the line with the new station
+    new_station = True
 
-        # Flag indicating that the next line to be read is the line with the new station
-        new_station = True
+    # Split the rest of the lines into station lines and blocks of picks belonging to each station
+    for line_number, line in enumerate(lines, 2):
 
-        # Read in the rest of the lines
-        for line in f:
+        # Stop reading if '-1' flag has been reached
+        if line.rstrip() == b'-1':
+            break
 
-            # Stop reading if '-1' flag has been reached
-            if line.replace('\n', '').replace('\r', '') == '-1':
-                break
+        # If the last line kad the control character 9, this marks the beginning of new station picks
+        if new_station:
 
-            # If the last line kad the control character 9, this marks the beginning of new station picks
-            if new_station:
+            # Unpack the fixed-width columns (the line is padded in case the weight is missing)
+            station_id, lat, lon, height, weight = MILIG_STATION_STRUCT.unpack_from(
+                line.ljust(MILIG_STATION_STRUCT.size))
 
-                # Station ID
-                station_id = line[:3].strip()
+            # Station ID
+            station_id = station_id.decode().strip()
 
-                # Station latitude in degrees, +N (converted to radians)                
-                lat = np.radians(float(line[3:13]))
+            # Station latitude in degrees, +N (converted to radians)                
+            lat = math.radians(float(lat))
 
-                # Station longitude in degrees, +E (converted to radians)
-                lon = np.radians(float(line[13:23]))
+            # Station longitude in degrees, +E (converted to radians)
+            lon = math.radians(float(lon))
 
-                # Station heightation in kilometers (converted to meters)
-                height = float(line[23:28])*1000
+            # Station heightation in kilometers (converted to meters)
+            height = float(height)*1000
 
-                # Weight of observations from this station (NOT USED)
-                weight = line[28:33]
+            # Weight of observations from this station (NOT USED)
+            weight = weight.decode()
 
-                # General comment for this station (NOT USED)
-                comment = line[33:]
+            # General comment for this station (NOT USED)
+            comment = line[MILIG_STATION_STRUCT.size:].decode(errors='replace')
 
+            if verbose:
                 print(station_id, lon, lat, height)
 
-                # Initialize a new station
-                station = StationData(station_id, lat, lon, height)
-                
-                # Add the station to the station list
-                stations.append(station)
+            # Initialize a new station
+            station = StationData(station_id, lat, lon, height)
+            
+            # Add the station to the station list
+            stations.append(station)
+            station_picks.append([])
+            station_pick_numbers.append([])
 
-                # Set the proper station list index
-                stat_ind = len(stations) - 1
+            new_station = False
+
+        else:
 
-                new_station = False
+            # Store the pick line, all picks from one station are parsed together below
+            station_picks[-1].append(line)
+            station_pick_numbers[-1].append(line_number)
 
-            else:
-                # Read the position pick from the previous station
+            # This number should be 9 if it is the last pick from this station, which means that the next
+            #   line will containg information about a new station
+            if int(line[17:20]) == 9:
+                new_station = True
 
-                # Azimuth +W of due South in degrees (converted to radians)
-                azim = np.radians(float(line[:9]))
 
-                # Zenith angle (converted to radians)
-                zangle = np.radians(float(line[9:17]))
+        # There are 2 extra rows in the MILIG format which are not read by this parser, as they do not
+        # contain information used by the solver in this library
 
-                # This number should be 9 if it is the last pick from this station
-                last_pick = int(line[17:20])
 
-                # Next line will containg information about a new station
-                if last_pick == 9:
-                    new_station = True
+    # Parse the picks from each station as one block of fixed-width columns:
+    #   azimuth +W of due South (deg), zenith angle (deg), last pick flag (9 if it's the last pick),
+    #   bad pick flag (if 1, the pick will be ignored), time in seconds from the reference time
+    for station, pick_lines, pick_numbers in zip(stations, station_picks, station_pick_numbers):
 
-                
-                # Flag indicating that the pick is bad. If it is 1, the pick will be ignored
-                bad_pick = int(line[20:23])
+        if not pick_lines:
+            continue
 
-                # Time in seconds from the reference GST
-                time = float(line[23:31])
+        picks = np.genfromtxt(io.BytesIO(b'\n'.join(pick_lines)), delimiter=MILIG_PICK_WIDTHS, 
+            dtype=np.float64)
+        picks = np.atleast_2d(picks)
 
-                # Add the time and coordinate to the station data
-                stations[stat_ind].time_data.append(time)
-                stations[stat_ind].azim_data.append(azim)
-                stations[stat_ind].zangle_data.append(zangle)
-                stations[stat_ind].ignore_picks.append(bad_pick)
+        # genfromtxt fills in the fields it cannot parse with NaNs, report the first malformed line
+        nan_rows = np.flatnonzero(np.isnan(picks).any(axis=1))
+        if len(nan_rows):
+            raise ValueError("Malformed pick of station {:s} on line {:d}: {:s}".format(station.station_id, 
+                pick_numbers[nan_rows[0]], pick_lines[nan_rows[0]].decode(errors='replace').rstrip()))
 
+        # Split the columns into separate arrays and convert the angles to radians
+        station.azim_data, station.zangle_data, station.ignore_picks, station.time_data = unpackPicks(picks)
 
-            # There are 2 extra rows in the MILIG format which are not read by this parser, as they do not
-            # contain information used by the solver in this library
+        # Store the columns as contiguous arrays
+        station.finalize()
 
 
-        return [jdt_ref, stations]
+    return [jdt_ref, stations]
 
 
 
@@ -183,7 +258,8 @@ def solveTrajectoryMILIG(dir_path, file_name, solver='original', **kwargs):
         file_name: [str] Name of the MILIG input file.
 
     Keyword arguments:
-        **kwargs: [dict] Additional keyword arguments will be directly passed to the trajectory solver.
+        **kwargs: [dict] Additional keyword arguments will be directly passed to the trajectory solver. If
+            'verbose' is given and True, the loaded input data will also be printed out.
 
 
     Return:
@@ -191,10 +267,14 @@ def solveTrajectoryMILIG(dir_path, file_name, solver='original', **kwargs):
 
     """
 
+    # Print out the loaded data only if verbose output was requested
+    verbose = kwargs.get('verbose', False)
+
     # Load data from the MILIG input file
-    jdt_ref, stations = loadMiligInput(os.path.join(dir_path, file_name))
+    jdt_ref, stations = loadMiligInput(os.path.join(dir_path, file_name), verbose=verbose)
 
-    print('JD', jdt_ref)
+    if verbose:
+        print('JD', jdt_ref)
 
     # Init the trajectory solver
     if solver == 'original':
@@ -218,7 +298,9 @@ def solveTrajectoryMILIG(dir_path, file_name, solver='original', **kwargs):
     # Infill data from each station to the solver
     for station in stations:
 
-        print(station)
+        # Only print a short summary, formatting all picks with StationData.__repr__ is not needed here
+        if verbose:
+            print('Station {:s}: {:d} picks'.format(str(station.station_id), len(station.time_data)))
 
 
         if solver == 'original':
@@ -243,8 +325,9 @@ def solveTrajectoryMILIG(dir_path, file_name, solver='original', **kwargs):
 
         elif 'gural' in solver:
 
-            traj.infillTrajectory(np.array(station.azim_data), np.array(station.zangle_data), 
-                np.array(station.time_data), station.lat, station.lon, station.height)
+            # The pick data are already stored as contiguous float64 arrays, so they are passed as they are
+            traj.infillTrajectory(station.azim_data, station.zangle_data, station.time_data, station.lat, 
+                station.lon, station.height)
 
 
         else:
@@ -301,46 +384,66 @@ def writeMiligInputFileStationData(jdt_ref, meteor_list, file_path, convergation
     datetime_obj = jd2Date(jdt_ref, dt_obj=True)
 
 
-    with open(file_path, 'w') as f:
+    # Lines of the output file, they are all written at once at the end
+    out_lines = []
+
+    datetime_str = datetime_obj.strftime("%Y%m%d%H%M%S.%f")[:16]
+
+    # Write the first line with the date, GST and Convergation control factor
+    out_lines.append(datetime_str + '{:10.3f}{:10.3f}\n'.format(gst, convergation_fact))
 
-        datetime_str = datetime_obj.strftime("%Y%m%d%H%M%S.%f")[:16]
+    # Go through every meteor
+    for meteor in meteor_list:
 
-        # Write the first line with the date, GST and Convergation control factor
-        f.write(datetime_str + '{:10.3f}{:10.3f}\n'.format(gst, convergation_fact))
+        # Write station ID and meteor coordinates. The weight of the station is set to 1
+        out_lines.append("{:3d}{:+10.5f}{:10.6f}{:5.3f}{:5.2f}\n".format(int(meteor.station_id), 
+            np.degrees(meteor.lon), np.degrees(meteor.lat), meteor.height/1000.0, 1.0))
 
-        # Go through every meteor
-        for meteor in meteor_list:
+        # Local numpy views of the pick data (they may have been assigned as lists), the station objects
+        #   are not modified
+        time_data = np.asarray(meteor.time_data, dtype=np.float64)
 
-            # Write station ID and meteor coordinates. The weight of the station is set to 1
-            f.write("{:3d}{:+10.5f}{:10.6f}{:5.3f}{:5.2f}\n".format(int(meteor.station_id), 
-                np.degrees(meteor.lon), np.degrees(meteor.lat), meteor.height/1000.0, 1.0))
+        # Convert all angles to degrees at once
+        azim_deg = np.degrees(np.asarray(meteor.azim_data, dtype=np.float64))
+        zangle_deg = np.degrees(np.asarray(meteor.zangle_data, dtype=np.float64))
 
-            # Go through every point in the meteor
-            for i, (azim, zangle, t) in enumerate(zip(meteor.azim_data, meteor.zangle_data, \
-                meteor.time_data)):
+        # Skip stations without any picks
+        if len(time_data) == 0:
+            continue
 
-                last_pick = 0
+        # The last pick from the station is marked by 9
+        last_pick = np.zeros(len(time_data), dtype=int)
+        last_pick[-1:] = 9
 
-                # If this is the last point, last_pick is 9
-                if i == len(meteor.time_data) - 1:
-                    last_pick = 9
+        # The 4th column is the ignore flag. If it is 1, the point will be ignored.
+        ignore_pick = np.zeros(len(time_data), dtype=int)
 
-                # Write individual meteor points. If the 4th column is 1, the point will be ignored.
-                if t < 0:
-                    time_format = "{:+8.5f}"
-                else:
-                    time_format = "{:8.6f}"
-                f.write(("{:9.5f}{:8.5f}{:3d}{:3d}" + time_format + "\n").format(np.degrees(azim), \
-                    np.degrees(zangle), last_pick, 0, t))
+        # Negative times are written with a sign and one decimal less so they fit the column
+        time_str = np.where(time_data < 0, np.char.mod("%+8.5f", time_data), 
+            np.char.mod("%8.6f", time_data))
 
-        # Flag indicating that the meteor data ends here
-        f.write('-1\n')
+        # Format all individual meteor points at once
+        pick_lines = np.char.mod("%9.5f", azim_deg)
+        pick_lines = np.char.add(pick_lines, np.char.mod("%8.5f", zangle_deg))
+        pick_lines = np.char.add(pick_lines, np.char.mod("%3d", last_pick))
+        pick_lines = np.char.add(pick_lines, np.char.mod("%3d", ignore_pick))
+        pick_lines = np.char.add(pick_lines, time_str)
+        pick_lines = np.char.add(pick_lines, "\n")
 
-        # Initial aproximations
-        f.write(' 0.0 0.0 0.0 0.0 0.0 0.0 0.0\n')
+        out_lines += pick_lines.tolist()
 
-        # Optional parameters
-        f.write('RFIX\n \n')
+    # Flag indicating that the meteor data ends here
+    out_lines.append('-1\n')
+
+    # Initial aproximations
+    out_lines.append(' 0.0 0.0 0.0 0.0 0.0 0.0 0.0\n')
+
+    # Optional parameters
+    out_lines.append('RFIX\n \n')
+
+
+    with open(file_path, 'w') as f:
+        f.write("".join(out_lines))
 
 
 
@@ -4,20 +4,29 @@ from __future__ import print_function, division, absolute_import
 
 import os
 import sys
+import math
 import time
 import numpy as np
 import numpy.ctypeslib as npct
 import ctypes as ct
 
-import scipy.optimize
-import matplotlib.pyplot as plt
-from matplotlib.pyplot import cm
+try:
+    # If Numba is available, use the jit decorator with specified options
+    from numba import njit
+
+except ImportError:
+    # If Numba is not available, define a no-op decorator that just returns the function unchanged (both
+    #   the @njit and the @njit(...) forms are supported)
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 
 from wmpl.Trajectory.Orbit import calcOrbit
-from wmpl.Utils.TrajConversions import geo2Cartesian, raDec2ECI, altAz2RADec_vect, \
+from wmpl.Utils.TrajConversions import geo2Cartesian_vect, geo2CartesianBatch, raDec2ECI, altAz2RADec_vect, \
     raDec2AltAz_vect, jd2Date
-from wmpl.Utils.Math import vectMag, findClosestPoints, sphericalToCartesian, lineFunc
+from wmpl.Utils.Math import findClosestPoints_vect
 from wmpl.Utils.OSTools import mkdirP
 from wmpl.Utils.Pickling import savePickle
 
@@ -28,6 +37,26 @@ TRAJ_LIBRARY = os.path.join('lib', 'trajectory', 'libtrajectorysolution')
 # Path to the default PSO configuration
 PSO_CONFIG_PATH = os.path.join('lib', 'trajectory', 'conf', 'trajectorysolution.conf')
 
+# Minimum number of points of a station for which the JIT-compiled functions are used, for fewer points the
+#   dispatch overhead is larger than the gain and the numpy versions are used
+NJIT_MIN_POINTS = 64
+
+# Conversions of the input measurements (meas1, meas2) to azimuth (+east of due north) and elevation, per
+#   measurement type. Arguments: meas1, meas2, jdt_ref, lat, lon
+MEASTYPE_TO_AZEL = {
+    # RA and Dec
+    1: lambda m1, m2, jd, lat, lon: raDec2AltAz_vect(m1, m2, jd, lat, lon),
+
+    # Azimuth +east of due north, and elevation angle
+    2: lambda m1, m2, *_: (m1, m2),
+
+    # Azimuth +west of due south, and zenith angle
+    3: lambda m1, m2, *_: ((m1 + np.pi)%(2*np.pi), np.pi/2.0 - m2),
+
+    # Azimuth +north of due east, and zenith angle
+    4: lambda m1, m2, *_: ((np.pi/2.0 - m1)%(2*np.pi), np.pi/2.0 - m2)
+    }
+
 
 ### VALUES FROM TrajectorySolution.h
 # last "fit" mnemonic token value + 1
@@ -36,6 +65,33 @@ NFIT_TYPES = 4
 # Unique ParameterRefinementViaPSO calls in trajectory
 NPSO_CALLS = 6
 
+# Format of one row in the "Points" section of the report (printf style, like the fmt of np.savetxt). A number
+#   of these fields were never implemented by the GuralTrajectory solver and are always written as 'None'
+REPORT_POINT_FORMAT = ', '.join([
+    '%3d', '%14s', '%7d',
+    '%9.6f', '%20.12f',
+    '%9.5f', '%9.5f',
+    'None'.rjust(22), 'None'.rjust(9), 'None'.rjust(15), 'None'.rjust(14), 'None'.rjust(12), 'None'.rjust(13),
+    'None'.rjust(13), 'None'.rjust(14),
+    '%11.2f', '%11.2f', '%11.2f',
+    '%14.6f', '%+15.6f', '%10.2f', '%10.2f',
+    '%10.2f', '%19.2f', '%9.2f',
+    '%9.2f', 'None'.rjust(18),
+    'None'.rjust(9), 'None'.rjust(9), 'None'.rjust(14),
+    '%6s', 'None'.rjust(6)
+    ]) + '\n'
+
+# Radians to degrees, for converting scalars without going through a numpy ufunc
+_DEG = 180.0/math.pi
+
+# Number of #cameras x #measurements arrays backed by the per camera meas_block
+NMEAS_ARRAYS = 18
+
+# Order of the arrays in the meas_block of every camera
+MEAS_BLOCK_ARRAYS = ['meas1', 'meas2', 'dtime', 'noise', 'weight', 'meas_lat', 'meas_lon', 'meas_hkm',
+    'meas_range', 'meas_vel', 'model_lat', 'model_lon', 'model_hkm', 'model_range', 'model_vel', 'model_fit1',
+    'model_fit2', 'model_time']
+
 ######
 
 # Init ctypes types
@@ -104,9 +160,11 @@ class TrajectoryInfo(ct.Structure):
         ('camera_hkm', PDOUBLE),
         ('camera_LST', PDOUBLE),
         ('rcamera_ECI', PPPDOUBLE),
+        ('rcamera_block', PPDOUBLE),
 
         # Measurement information
         ('nummeas', ct.POINTER(ct.c_int)),
+        ('meas_block', PPDOUBLE),
 
         ('meas1', PPDOUBLE),
         ('meas2', PPDOUBLE),
@@ -115,6 +173,7 @@ class TrajectoryInfo(ct.Structure):
         ('weight', PPDOUBLE),
 
         ('meashat_ECI', PPPDOUBLE),
+        ('meashat_block', PPDOUBLE),
         ('ttbeg', DOUBLE),
         ('ttend', DOUBLE),
         ('ttzero', DOUBLE),
@@ -133,36 +192,36 @@ class TrajectoryInfo(ct.Structure):
         ('solution', PDOUBLE),
 
         # Primary output products and their standard deviations (sigma)
-        ('ra_radiant', PDOUBLE),
-        ('dec_radiant', PDOUBLE),
+        ('ra_radiant', DOUBLE),
+        ('dec_radiant', DOUBLE),
 
-        ('vbegin', PDOUBLE),
-        ('decel1', PDOUBLE),
-        ('decel2', PDOUBLE),
+        ('vbegin', DOUBLE),
+        ('decel1', DOUBLE),
+        ('decel2', DOUBLE),
 
-        ('ra_sigma', PDOUBLE),
-        ('dec_sigma', PDOUBLE),
+        ('ra_sigma', DOUBLE),
+        ('dec_sigma', DOUBLE),
 
-        ('vbegin_sigma', PDOUBLE),
-        ('decel1_sigma', PDOUBLE),
-        ('decel2_sigma', PDOUBLE),
+        ('vbegin_sigma', DOUBLE),
+        ('decel1_sigma', DOUBLE),
+        ('decel2_sigma', DOUBLE),
 
         # Intermediate bootstrapping solutions
-        ('max_convergence', PDOUBLE),
-        ('ra_radiant_IP', PDOUBLE),
-        ('dec_radiant_IP', PDOUBLE),
+        ('max_convergence', DOUBLE),
+        ('ra_radiant_IP', DOUBLE),
+        ('dec_radiant_IP', DOUBLE),
 
-        ('ra_radiant_IPW', PDOUBLE),
-        ('dec_radiant_IPW', PDOUBLE),
+        ('ra_radiant_IPW', DOUBLE),
+        ('dec_radiant_IPW', DOUBLE),
 
-        ('ra_radiant_LMS', PDOUBLE),
-        ('dec_radiant_LMS', PDOUBLE),
+        ('ra_radiant_LMS', DOUBLE),
+        ('dec_radiant_LMS', DOUBLE),
 
         # Timing output relative to jdt_ref in seconds
-        ('dtime_ref', PDOUBLE),
-        ('dtime_tzero', PDOUBLE),
-        ('dtime_beg', PDOUBLE),
-        ('dtime_end', PDOUBLE),
+        ('dtime_ref', DOUBLE),
+        ('dtime_tzero', DOUBLE),
+        ('dtime_beg', DOUBLE),
+        ('dtime_end', DOUBLE),
         ('tref_offsets', PDOUBLE),
 
         # Measurement and model LLA, range and velocity arrays with dimension #cameras x #measurements(camera)
@@ -184,29 +243,31 @@ class TrajectoryInfo(ct.Structure):
         ('model_time', PPDOUBLE),
 
         # BEGIN position and standard deviation in LLA
-        ('rbeg_lat', PDOUBLE),
-        ('rbeg_lon', PDOUBLE),
-        ('rbeg_hkm', PDOUBLE),
+        ('rbeg_lat', DOUBLE),
+        ('rbeg_lon', DOUBLE),
+        ('rbeg_hkm', DOUBLE),
 
-        ('rbeg_lat_sigma', PDOUBLE),
-        ('rbeg_lon_sigma', PDOUBLE),
-        ('rbeg_hkm_sigma', PDOUBLE),
+        ('rbeg_lat_sigma', DOUBLE),
+        ('rbeg_lon_sigma', DOUBLE),
+        ('rbeg_hkm_sigma', DOUBLE),
 
         # END position and standard deviation in LLA
-        ('rend_lat', PDOUBLE),
-        ('rend_lon', PDOUBLE),
-        ('rend_hkm', PDOUBLE),
+        ('rend_lat', DOUBLE),
+        ('rend_lon', DOUBLE),
+        ('rend_hkm', DOUBLE),
 
-        ('rend_lat_sigma', PDOUBLE),
-        ('rend_lon_sigma', PDOUBLE),
-        ('rend_hkm_sigma', PDOUBLE)
+        ('rend_lat_sigma', DOUBLE),
+        ('rend_lon_sigma', DOUBLE),
+        ('rend_hkm_sigma', DOUBLE)
     ]
 
 
 
 
 def double2ArrayToPointer(arr):
-    """ Converts a 2D numpy to ctypes 2D array.
+    """ Converts a 2D numpy to ctypes 2D array. The rows of the returned pointer point directly into the
+        memory of the numpy array (which is only copied if it is not a writable C-contiguous float64 array),
+        so no per-element conversion is done.
 
     Arguments:
         arr: [ndarray] 2D numpy float64 array
@@ -216,19 +277,22 @@ def double2ArrayToPointer(arr):
 
     """
 
-    # Init needed data types
-    ARR_DIMX = DOUBLE*arr.shape[1]
-    ARR_DIMY = PDOUBLE*arr.shape[0]
+    # Make sure the data is laid out in memory as the C side expects it
+    arr = np.require(arr, dtype=np.float64, requirements=['C', 'W'])
+
+    # Map the numpy array memory to a ctypes 2D array, without copying
+    arr_rows = (DOUBLE*arr.shape[1]*arr.shape[0]).from_buffer(arr)
 
     # Init pointer
-    arr_ptr = ARR_DIMY()
+    arr_ptr = (PDOUBLE*arr.shape[0])()
 
-    # Fill the 2D ctypes array with values
-    for i, row in enumerate(arr):
-        arr_ptr[i] = ARR_DIMX()
+    # Point every row pointer to the beginning of the corresponding row
+    for i in range(arr.shape[0]):
+        arr_ptr[i] = ct.cast(arr_rows[i], PDOUBLE)
 
-        for j, val in enumerate(row):
-            arr_ptr[i][j] = val
+    # Keep a reference to the underlying memory so it is not garbage collected while the pointer is in use
+    arr_ptr._arr = arr
+    arr_ptr._arr_rows = arr_rows
 
 
     return arr_ptr
@@ -247,12 +311,8 @@ def double1pointerToArray(ptr, n):
 
     """
 
-    # Init a new empty data array
-    arr = np.zeros(shape=n)
-
-    # Go through every camera
-    for i in range(n):
-        arr[i] = ptr[i]
+    # Copy out the values of all cameras at once
+    arr = np.ctypeslib.as_array(ptr, shape=(n,)).copy()
 
     return arr
 
@@ -272,63 +332,334 @@ def double2pointerToArray(ptr, n, m_sizes):
 
     """
 
-    arr_list = []
+    # Copy out the whole row of every camera at once (the C memory is freed after the solution is read)
+    arr_list = [np.ctypeslib.as_array(ptr[i], shape=(m_sizes[i],)).copy() for i in range(n)]
 
-    # Go through every camera
-    for i in range(n):
+    return arr_list
 
-        # Init a new empty data array
-        arr = np.zeros(shape=(m_sizes[i]))
 
-        # Go through ctypes array and extract data for this camera
-        for j in range(m_sizes[i]):
-            arr[j] = ptr[i][j]
 
-        # Add the data for this camera to the final list
-        arr_list.append(arr)
+def vectBlockToArrays(ptr, n, m_sizes, p, stride):
+    """ Converts the ctypes per camera memory blocks backing the #cameras x #measurements x #values arrays
+        (e.g. meashat_block) into numpy arrays.
+
+    Arguments:
+        ptr: [ctypes double pointer] Pointer to the per camera memory blocks.
+        n: [int] number of cameras
+        m_sizes: [list] number of measurements for each camera
+        p: [int] number of values for each measurement to read out
+        stride: [int] number of values stored for each measurement in the block (not smaller than p)
+
+    Return:
+        arr_list: [list of ndarrays] list of (m, p) numpy arrays, each list entry containing data for
+            individual cameras
+
+    """
+
+    # Copy out the whole block of every camera at once
+    arr_list = [np.ctypeslib.as_array(ptr[i], shape=(m_sizes[i], stride))[:, :p].copy() for i in range(n)]
 
     return arr_list
 
 
 
-def double3pointerToArray(ptr, n, m_sizes, p):
-    """ Converts ctypes 3D array into a 3D numpy array.
+def measBlockToArrays(ptr, n, m_sizes):
+    """ Converts the ctypes per camera memory blocks which back all #cameras x #measurements arrays of the
+        solver into numpy arrays.
 
     Arguments:
-        ptr: [ctypes double pointer]
+        ptr: [ctypes double pointer] Pointer to the meas_block of the trajectory structure.
         n: [int] number of cameras
         m_sizes: [list] number of measurements for each camera
-        p: [int] number of values for each measurement
 
     Return:
-        arr_list: [list of ndarrays] list of numpy arrays, each list entry containing data for individual
-            cameras
+        (arr_dict, padded_dict):
+            arr_dict: [dict] A dictionary of lists of numpy arrays, keyed by the names in MEAS_BLOCK_ARRAYS.
+                Each list entry contains data for individual cameras.
+            padded_dict: [dict] A dictionary of (n, max(m_sizes)) numpy arrays, keyed by the names in
+                MEAS_BLOCK_ARRAYS. Rows of cameras with fewer measurements are padded with zeros. The
+                entries of arr_dict are views into these arrays.
 
     """
 
-    arr_list = []
+    # One contiguous array for all arrays and cameras, padded to the largest number of measurements
+    padded = np.zeros((NMEAS_ARRAYS, n, max(m_sizes)))
 
     # Go through every camera
     for i in range(n):
 
-        # Init a new empty data array
-        arr = np.zeros(shape=(m_sizes[i], p))
+        # Copy out all the arrays of this camera at once
+        padded[:, i, :m_sizes[i]] = np.ctypeslib.as_array(ptr[i], shape=(NMEAS_ARRAYS, m_sizes[i]))
 
-        # Go through ctypes array and extract data for this camera
-        for j in range(m_sizes[i]):
+    padded_dict = dict(zip(MEAS_BLOCK_ARRAYS, padded))
+    arr_dict = {name: [arr[i, :m_sizes[i]] for i in range(n)] for name, arr in padded_dict.items()}
 
-            # Go through every value for each measurement
-            for k in range(p):
-                arr[j,k] = ptr[i][j][k]
+    return arr_dict, padded_dict
 
-        # Add the data for this camera to the final list
-        arr_list.append(arr)
 
-    return arr_list
+
+@njit(cache=True, boundscheck=False)
+def _calcTrailLengthsJIT(rad_cpa_arr, beg_cpa):
+    """ JIT-compiled version of calcTrailLengths, see it for the description. """
+
+    n = rad_cpa_arr.shape[0]
+
+    length = np.empty(n)
+    state_vector_distance = np.empty(n)
+
+    for i in range(n):
+
+        # Calculate the distance from the first observed point to the projected point on the radiant line
+        dx = rad_cpa_arr[0, 0] - rad_cpa_arr[i, 0]
+        dy = rad_cpa_arr[0, 1] - rad_cpa_arr[i, 1]
+        dz = rad_cpa_arr[0, 2] - rad_cpa_arr[i, 2]
+        length[i] = math.sqrt(dx*dx + dy*dy + dz*dz)
+
+        # Calculate the distance from the beginning of the trajectory to the projected point
+        dx = beg_cpa[0] - rad_cpa_arr[i, 0]
+        dy = beg_cpa[1] - rad_cpa_arr[i, 1]
+        dz = beg_cpa[2] - rad_cpa_arr[i, 2]
+        state_vector_distance[i] = math.sqrt(dx*dx + dy*dy + dz*dz)
+
+    return length, state_vector_distance
+
+
+
+def calcTrailLengths(rad_cpa_arr, beg_cpa):
+    """ Calculates the length along the trail and the distance from the beginning of the trajectory for all
+        points of one station projected on the radiant line.
+
+    Arguments:
+        rad_cpa_arr: [ndarray] (N, 3) array of ECI coordinates of the projections on the radiant line.
+        beg_cpa: [ndarray] ECI coordinates of the beginning of the trajectory.
+
+    Return:
+        (length, state_vector_distance): [tuple of ndarrays] Distances from the first observed point and from
+            the beginning of the trajectory to every projected point.
+    """
+
+    # Use the compiled version only for long enough stations
+    if len(rad_cpa_arr) >= NJIT_MIN_POINTS:
+        return _calcTrailLengthsJIT(rad_cpa_arr, beg_cpa)
+
+    if len(rad_cpa_arr) == 0:
+        return np.empty(0), np.empty(0)
+
+    # Calculate the distance from the first observed point to the projected points on the radiant line
+    length = np.linalg.norm(rad_cpa_arr[0] - rad_cpa_arr, axis=1)
+
+    # Calculate the distance from the beginning of the trajectory to the projected points
+    state_vector_distance = np.linalg.norm(beg_cpa - rad_cpa_arr, axis=1)
+
+    return length, state_vector_distance
+
+
+
+# Machine precision, used instead of zero time differences to avoid division by zero
+FLOAT64_EPS = np.finfo(np.float64).eps
+
+@njit(cache=True, boundscheck=False)
+def _calcPointVelocitiesJIT(time_data, length):
+    """ JIT-compiled version of calcPointVelocities, see it for the description. """
+
+    n = length.shape[0]
+
+    velocity = np.empty(n)
+
+    for i in range(n):
+
+        # The first point is differenced against zero
+        if i == 0:
+            dist_diff = length[0]
+            time_diff = time_data[0]
+
+        else:
+            dist_diff = length[i] - length[i - 1]
+            time_diff = time_data[i] - time_data[i - 1]
+
+        if time_diff == 0:
+            time_diff = FLOAT64_EPS
+
+        velocity[i] = dist_diff/time_diff
+
+    return velocity
+
+
+
+def calcPointVelocities(time_data, length):
+    """ Calculates the instantaneous velocity from point to point. The first point is differenced against zero
+        length and zero time.
+
+    Arguments:
+        time_data: [ndarray] Time of every point (seconds).
+        length: [ndarray] Length along the trail of every point (meters).
+
+    Return:
+        velocity: [ndarray] Velocity at every point (m/s).
+    """
+
+    # Use the compiled version only for long enough stations
+    if len(length) >= NJIT_MIN_POINTS:
+        return _calcPointVelocitiesJIT(time_data, length)
+
+    # Calculate distance differences from point to point (the first point is differenced against 0)
+    dists_diffs = np.empty_like(length)
+    dists_diffs[:1] = length[:1]
+    np.subtract(length[1:], length[:-1], out=dists_diffs[1:])
+
+    # Calculate the time differences from point to point
+    time_diffs = np.empty_like(length)
+    time_diffs[:1] = time_data[:1]
+    np.subtract(time_data[1:], time_data[:-1], out=time_diffs[1:])
+
+    # Replace zeros in time by machine precision value to avoid division by zero errors
+    time_diffs[time_diffs == 0] = FLOAT64_EPS
+
+    # Calculate velocity for every point (in place, the distance differences are not needed anymore)
+    velocity = np.divide(dists_diffs, time_diffs, out=dists_diffs)
+
+    return velocity
+
+
+
+# Loaded trajectory library, shared between all trajectory solutions in the process
+_TRAJ_LIB = None
+
+def loadTrajectoryLibrary():
+    """ Loads the compiled Gural trajectory library and defines the argument and return types of its
+        functions. The library is only loaded once per process, later calls return the same object.
+
+    Return:
+        traj_lib: [ctypes library object]
+
+    """
+
+    global _TRAJ_LIB
+
+    if _TRAJ_LIB is not None:
+        return _TRAJ_LIB
+
+    # Load the trajectory library
+    traj_lib = npct.load_library(TRAJ_LIBRARY, os.path.dirname(__file__))
+
+
+    ### Define trajectory function types and argument types ###
+    ##########################################################################################################
+
+
+    traj_lib.MeteorTrajectory.restype = ct.c_int
+    traj_lib.MeteorTrajectory.argtypes = [
+        ct.POINTER(TrajectoryInfo)
+    ]
+
+
+    traj_lib.InitTrajectoryStructure.restype = ct.c_void_p
+    traj_lib.InitTrajectoryStructure.argtypes = [
+        ct.c_int,
+        ct.POINTER(TrajectoryInfo)
+    ]
+
+
+    traj_lib.ReadTrajectoryPSOconfig.restype = ct.c_void_p
+    traj_lib.ReadTrajectoryPSOconfig.argtypes = [
+        ct.POINTER(ct.c_char),
+        ct.POINTER(TrajectoryInfo)
+    ]
+
+
+    traj_lib.FreeTrajectoryStructure.restype = ct.c_void_p
+    traj_lib.FreeTrajectoryStructure.argtypes = [
+        ct.POINTER(TrajectoryInfo)
+    ]
+
+
+    traj_lib.ResetTrajectoryStructure.restype = ct.c_void_p
+    traj_lib.ResetTrajectoryStructure.argtypes = [
+        ct.c_double,
+        ct.c_double,
+        ct.c_int,
+        ct.c_int,
+        ct.c_int,
+        ct.c_int,
+        ct.POINTER(TrajectoryInfo)
+    ]
+
+
+    traj_lib.InfillTrajectoryStructure.restype = ct.c_void_p
+    traj_lib.InfillTrajectoryStructure.argtypes = [
+        ct.c_int,
+        PDOUBLE,
+        PDOUBLE,
+        PDOUBLE,
+        PDOUBLE,
+        ct.c_double,
+        ct.c_double,
+        ct.c_double,
+        ct.POINTER(TrajectoryInfo)
+    ]
+
+    ##########################################################################################################
+
+
+    _TRAJ_LIB = traj_lib
+
+    return traj_lib
+
 
 
+def fitLine(x, y):
+    """ Fits a line to the given points with ordinary least squares. This is the closed form solution of the
+        line fit that scipy.optimize.curve_fit would find iteratively.
 
-def fitLagIntercept(time, length, v_init, initial_intercept=0.0):
+    Arguments:
+        x: [ndarray] Independant variable.
+        y: [ndarray] Dependant variable.
+
+    Return:
+        (popt, pcov): [tuple] Fitted (slope, intercept) and their covariance matrix, estimated from the
+            residuals as curve_fit does. If there are only 2 points or all x values are the same, the covariance
+            is infinite.
+    """
+
+    n = len(x)
+
+    if n < 2:
+        raise ValueError('At least 2 points are needed to fit a line, {:d} given!'.format(n))
+
+    # Solve the normal equations in closed form, on the centered data for numerical stability
+    x_mean = np.mean(x)
+    y_mean = np.mean(y)
+    dx = x - x_mean
+    sxx = dx.dot(dx)
+
+    # The slope is not constrained if all x values are the same
+    if sxx == 0:
+        return np.array([np.nan, y_mean]), np.full((2, 2), np.inf)
+
+    slope = dx.dot(y - y_mean)/sxx
+    intercept = y_mean - slope*x_mean
+
+    popt = np.array([slope, intercept])
+
+    # Estimate the covariance from the residuals, if the fit is overdetermined
+    if n > 2:
+        residuals = y - slope*x - intercept
+        sigma2 = residuals.dot(residuals)/(n - 2)
+
+        pcov = sigma2*np.array([
+            [1.0/sxx,       -x_mean/sxx],
+            [-x_mean/sxx,   1.0/n + x_mean**2/sxx]
+            ])
+
+    else:
+        pcov = np.full((2, 2), np.inf)
+
+
+    return popt, pcov
+
+
+
+def fitLagIntercept(time, length, v_init):
     """ Finds the intercept of the line with the given slope. Used for fitting time vs. length along the trail
         data.
 
@@ -337,9 +668,6 @@ def fitLagIntercept(time, length, v_init, initial_intercept=0.0):
         length: [ndarray] Array containing the length along the trail data.
         v_init: [float] Fixed slope of the line (i.e. initial velocity).
 
-    Keyword arguments:
-        initial_intercept: [float] Initial estimate of the intercept.
-
     Return:
         (slope, intercept): [tuple of floats] fitted line parameters
     """
@@ -354,11 +682,11 @@ def fitLagIntercept(time, length, v_init, initial_intercept=0.0):
     quart_length = length[:quart_size]
     quart_time = time[:quart_size]
 
-    # Redo the lag fit, but with fixed velocity
-    lag_intercept, _ = scipy.optimize.curve_fit(lambda x, intercept: lineFunc(x, v_init, intercept),
-        quart_time, quart_length, p0=[initial_intercept])
+    # Redo the lag fit, but with fixed velocity - with a fixed slope, the least squares intercept is the mean
+    #   of the residuals of the line going through the origin
+    lag_intercept = float(np.mean(quart_length - v_init*quart_time))
 
-    return v_init, lag_intercept[0]
+    return v_init, lag_intercept
 
 
 class GuralTrajectory(object):
@@ -382,7 +710,7 @@ class GuralTrajectory(object):
 
     def __init__(self, maxcameras, jdt_ref, velmodel, max_toffset=1.0, nummonte=1, meastype=4, verbose=0,
         output_dir='.', pso_config=None, show_plots=True, save_results=True, traj_id=None,
-        comment=''):
+        comment='', traj_struct=None):
         """ Initialize meteor trajectory solving.
 
         Arguments:
@@ -420,6 +748,10 @@ class GuralTrajectory(object):
             show_plots: [bool] Show plots of residuals, velocity, lag, meteor position. True by default.
             traj_id: [str] Trajectory solution identifier.
             comment: [str] Arbitrary string that can be saved.
+            traj_struct: [TrajectoryInfo] An already initialized trajectory structure with the PSO
+                configuration read in, allocated for at least maxcameras cameras. None by default, in which
+                case a new structure is initialized. A given structure is only reset and it is not freed
+                after the solution, so it can be reused for solving many meteors (see solveBatch).
         """
 
         # Init input parameters
@@ -560,6 +892,15 @@ class GuralTrajectory(object):
         # Array of velocity on the trail at each model position
         self.model_vel = 0
 
+        # Model positions and times as #cameras x max(#measurements) arrays, padded with zeros (use meas_mask)
+        self.model_lat_2d = 0
+        self.model_lon_2d = 0
+        self.model_hkm_2d = 0
+        self.model_time_2d = 0
+
+        # Mask of #cameras x max(#measurements) which is True for the valid entries of the padded arrays
+        self.meas_mask = 0
+
         # Array of timing offsets in seconds
         self.tref_offsets = 0
 
@@ -605,6 +946,9 @@ class GuralTrajectory(object):
         # List containing Julian dates of observations from each station
         self.JD_data_cameras = None
 
+        # Julian dates of the observations from all stations in one array
+        self._jd_concat = None
+
         # List containing ECI coordinates of the stations, as they moved through time
         self.stations_eci_cameras = None
 
@@ -642,77 +986,98 @@ class GuralTrajectory(object):
 
 
         # Load the trajectory library
-        self.traj_lib = npct.load_library(TRAJ_LIBRARY, os.path.dirname(__file__))
+        self.traj_lib = loadTrajectoryLibrary()
 
 
-        ### Define trajectory function types and argument types ###
-        ######################################################################################################
+        # Use the given trajectory structure (its owner frees it), or init a new one
+        self.shared_traj = traj_struct is not None
 
+        if self.shared_traj:
+            self.traj = traj_struct
 
-        self.traj_lib.MeteorTrajectory.restype = ct.c_int
-        self.traj_lib.MeteorTrajectory.argtypes = [
-            ct.POINTER(TrajectoryInfo)
-        ]
+        else:
 
+            # Init the trajectory structure
+            self.traj = TrajectoryInfo()
+            self.traj_lib.InitTrajectoryStructure(maxcameras, self.traj)
 
-        self.traj_lib.InitTrajectoryStructure.restype = ct.c_void_p
-        self.traj_lib.InitTrajectoryStructure.argtypes = [
-            ct.c_int,
-            ct.POINTER(TrajectoryInfo)
-        ]
+            # Read PSO parameters
+            self.traj_lib.ReadTrajectoryPSOconfig(self.pso_config.encode('ascii'), self.traj)
 
+        # Reset the trajectory structure
+        self.traj_lib.ResetTrajectoryStructure(jdt_ref, max_toffset, velmodel, nummonte, meastype, verbose,
+            self.traj)
 
-        self.traj_lib.ReadTrajectoryPSOconfig.restype = ct.c_void_p
-        self.traj_lib.ReadTrajectoryPSOconfig.argtypes = [
-            ct.POINTER(ct.c_char),
-            ct.POINTER(TrajectoryInfo)
-        ]
 
 
-        self.traj_lib.FreeTrajectoryStructure.restype = ct.c_void_p
-        self.traj_lib.FreeTrajectoryStructure.argtypes = [
-            ct.POINTER(TrajectoryInfo)
-        ]
+    @classmethod
+    def solveBatch(cls, meteor_list, velmodel, pso_config=None, **kwargs):
+        """ Solve the trajectories of a batch of meteors. The trajectory structure is allocated and the PSO
+            configuration is read only once, and all solutions share them.
 
+        Arguments:
+            meteor_list: [list] A list of (jdt_ref, observations) tuples, one per meteor. The observations are
+                a list of dictionaries, one per station, with keyword arguments for infillTrajectory
+                (theta_data, phi_data, time_data, lat, lon, ele, and optionally the other ones).
+            velmodel: [int] Velocity propagation model (see __init__).
 
-        self.traj_lib.ResetTrajectoryStructure.restype = ct.c_void_p
-        self.traj_lib.ResetTrajectoryStructure.argtypes = [
-            ct.c_double,
-            ct.c_double,
-            ct.c_int,
-            ct.c_int,
-            ct.c_int,
-            ct.c_int,
-            ct.POINTER(TrajectoryInfo)
-        ]
+        Keyword arguments:
+            pso_config: [str] Path to the PSO configuration file. None by default, in which case the default
+                configuration shipped with the module is used.
+            **kwargs: Other keyword arguments passed to the constructor of every solution.
 
+        Return:
+            traj_list: [list] A list of solved GuralTrajectory objects, in the order of meteor_list.
+        """
 
-        self.traj_lib.InfillTrajectoryStructure.restype = ct.c_void_p
-        self.traj_lib.InfillTrajectoryStructure.argtypes = [
-            ct.c_int,
-            PDOUBLE,
-            PDOUBLE,
-            PDOUBLE,
-            PDOUBLE,
-            ct.c_double,
-            ct.c_double,
-            ct.c_double,
-            ct.POINTER(TrajectoryInfo)
-        ]
+        if pso_config is None:
+            pso_config = os.path.join(os.path.dirname(__file__), PSO_CONFIG_PATH)
 
-        ######################################################################################################
+        traj_lib = loadTrajectoryLibrary()
 
+        # Allocate the structure for the meteor with the largest number of stations
+        maxcameras = max(len(observations) for _, observations in meteor_list)
 
-        # Init the trajectory structure
-        self.traj = TrajectoryInfo()
-        self.traj_lib.InitTrajectoryStructure(maxcameras, self.traj)
+        traj_struct = TrajectoryInfo()
+        traj_lib.InitTrajectoryStructure(maxcameras, traj_struct)
+        traj_lib.ReadTrajectoryPSOconfig(pso_config.encode('ascii'), traj_struct)
 
-        # Read PSO parameters
-        self.traj_lib.ReadTrajectoryPSOconfig(self.pso_config.encode('ascii'), self.traj)
+        traj_list = []
+
+        try:
+
+            for jdt_ref, observations in meteor_list:
+
+                traj = cls(len(observations), jdt_ref, velmodel, pso_config=pso_config,
+                    traj_struct=traj_struct, **kwargs)
+
+                for obs in observations:
+                    traj.infillTrajectory(**obs)
+
+                traj.run()
+
+                traj_list.append(traj)
+
+        finally:
+            traj_lib.FreeTrajectoryStructure(traj_struct)
 
-        # Reset the trajectory structure
-        self.traj_lib.ResetTrajectoryStructure(jdt_ref, max_toffset, velmodel, nummonte, meastype, verbose,
-            self.traj)
+
+        return traj_list
+
+
+
+    @staticmethod
+    def precompile():
+        """ Compile the JIT functions used by the solver on a small dummy input. The compiled functions are
+            cached on disk, so this only takes time the first time it is called, but calling it before
+            processing a batch of trajectories moves the compilation out of the first solution.
+        """
+
+        rad_cpa_arr = np.zeros((8, 3))
+        rad_cpa_arr[:, 2] = np.arange(8)
+
+        length, _ = _calcTrailLengthsJIT(rad_cpa_arr, rad_cpa_arr[0])
+        _calcPointVelocitiesJIT(np.arange(8, dtype=np.float64), length)
 
 
 
@@ -767,12 +1132,18 @@ class GuralTrajectory(object):
 
         # If the measurement noise is not given, set it to 0
         if noise is None:
-            noise = np.zeros_like(time_data)*0.0
+            noise = np.zeros(nummeas)
+
+        # Make sure the data is laid out in memory as the library expects it, so it can be passed as a pointer
+        theta_data = np.ascontiguousarray(theta_data, dtype=np.float64)
+        phi_data = np.ascontiguousarray(phi_data, dtype=np.float64)
+        time_data = np.ascontiguousarray(time_data, dtype=np.float64)
+        noise = np.ascontiguousarray(noise, dtype=np.float64)
 
         # Fill the trajectory structure for site 1
-        self.traj_lib.InfillTrajectoryStructure(nummeas, npct.as_ctypes(theta_data),
-            npct.as_ctypes(phi_data), npct.as_ctypes(time_data), npct.as_ctypes(noise), lat, lon, ele/1000.0,
-            self.traj)
+        self.traj_lib.InfillTrajectoryStructure(nummeas, theta_data.ctypes.data_as(PDOUBLE),
+            phi_data.ctypes.data_as(PDOUBLE), time_data.ctypes.data_as(PDOUBLE), noise.ctypes.data_as(PDOUBLE),
+            lat, lon, ele/1000.0, self.traj)
 
 
 
@@ -789,28 +1160,26 @@ class GuralTrajectory(object):
         # Calculate positions of stations in ECI coordinates, for every point on the meteor's trajectory
         for kmeas, (lat, lon, hkm) in enumerate(zip(self.camera_lat, self.camera_lon, self.camera_hkm)):
 
-            station_pos = []
-
             # Calculate time with time offsets included
             time_data = self.dtime[kmeas] + self.tref_offsets[kmeas]
 
             self.times.append(time_data)
 
-            # Calculate Julian date
-            jd_data = self.jdt_ref + time_data/86400.0
+            # Calculate Julian date (in place, without intermediate arrays)
+            jd_data = np.divide(time_data, 86400.0)
+            np.add(jd_data, self.jdt_ref, out=jd_data)
 
             self.JD_data_cameras.append(jd_data)
 
-            # Go though every point in time of the measurement
-            for jd in jd_data:
+            # Calculate the ECI position of the station at every point in time of the measurement
+            station_pos = np.array(geo2Cartesian_vect(lat, lon, hkm*1000.0, jd_data)).T
 
-                # Calculate the ECI position of the station at the given time
-                x, y, z = geo2Cartesian(lat, lon, hkm*1000.0, jd)
 
-                station_pos.append([x, y, z])
+            self.stations_eci_cameras.append(station_pos)
 
 
-            self.stations_eci_cameras.append(station_pos)
+        # Julian dates of all observations, used for the average and the first JD
+        self._jd_concat = np.concatenate(self.JD_data_cameras)
 
 
         ### Get the RA/Dec for each measurement
@@ -818,37 +1187,15 @@ class GuralTrajectory(object):
         self.ra_dec_los_cameras = []
         self.meas_eci_los_cameras = []
 
+        # Pick the conversion of the measurements to azimuth and elevation
+        to_azel = MEASTYPE_TO_AZEL[self.meastype]
+
         # Go through each station:
         for jd_data, meas1, meas2, lat, lon in zip(self.JD_data_cameras, self.meas1, self.meas2, \
             self.camera_lat, self.camera_lon):
 
-            # If inputs are RA and Dec
-            if self.meastype == 1:
-
-                ra_data = meas1
-                dec_data = meas2
-
-                # Calculate azimuth and elevation
-                azim_data, elev_data = raDec2AltAz_vect(ra_data, dec_data, self.jdt_ref, lat, lon)
-
-
-            # If inputs are azimuth +east of due north, and elevation angle
-            elif self.meastype == 2:
-
-                azim_data = meas1
-                elev_data = meas2
-
-            # If inputs are azimuth +west of due south, and zenith angle
-            elif self.meastype == 3:
-
-                azim_data = (meas1 + np.pi)%(2*np.pi)
-                elev_data = np.pi/2.0 - meas2
-
-            # If input are azimuth +north of due east, and zenith angle
-            elif self.meastype == 4:
-
-                azim_data = (np.pi/2.0 - meas1)%(2*np.pi)
-                elev_data = np.pi/2.0 - meas2
+            # Calculate azimuth and elevation
+            azim_data, elev_data = to_azel(meas1, meas2, self.jdt_ref, lat, lon)
 
 
             # Calculate RA and declination for the line of sight method
@@ -877,78 +1224,40 @@ class GuralTrajectory(object):
         # Calculate ECI coordinates of all LoS projections on the trajectory
         for stat_eci_los, meas_eci_los in zip(self.stations_eci_cameras, self.meas_eci_los_cameras):
 
-            rad_cpa_list = []
+            # Calculate closest points of approach (observed lines of sight to radiant line) for all
+            #   individual position measurements from each site
+            _, rad_cpa_arr, _ = findClosestPoints_vect(stat_eci_los, meas_eci_los, self.state_vect,
+                self.radiant_eci)
 
-            # Go through all individual position measurement from each site
-            for stat, meas in zip(stat_eci_los, meas_eci_los):
+            # Save ECI coordinates of the projections on the trajectory
+            rad_cpa_all_stations.append(rad_cpa_arr)
 
-                # Calculate closest points of approach (observed line of sight to radiant line)
-                _, rad_cpa, _ = findClosestPoints(stat, meas, self.state_vect, self.radiant_eci)
+            # Compute the distances from the centre of the Earth
+            ht_center = np.linalg.norm(rad_cpa_arr, axis=1)
 
-                # Save ECI coordinates of the projection on the trajectory
-                rad_cpa_list.append(rad_cpa)
-
-                # Compute the distance from the centre of the Earth
-                ht_center = vectMag(rad_cpa)
-
-                # Save the ECI coordinate as the beginning if it has the highest height
-                if ht_center > max_ht:
-                    max_ht = ht_center
-                    beg_cpa = np.copy(rad_cpa)
-
-            rad_cpa_all_stations.append(rad_cpa_list)
+            # Save the ECI coordinate as the beginning if it has the highest height
+            if len(ht_center):
+                i_max = np.argmax(ht_center)
+                if ht_center[i_max] > max_ht:
+                    max_ht = ht_center[i_max]
+                    beg_cpa = rad_cpa_arr[i_max]
 
 
         ### Calculate lengths and instantaneous velocities for all stations
-        for kmeas, rad_cpa_list in enumerate(rad_cpa_all_stations):
+        for kmeas, rad_cpa_arr in enumerate(rad_cpa_all_stations):
 
             # Calculate the time data
             time_data = self.times[kmeas]
 
-            radiant_distances = []
-            state_vector_distance = []
-
-            for i, rad_cpa in enumerate(rad_cpa_list):
-
-                # Take the position of the first point as the reference point
-                if i == 0:
-                    ref_point = np.copy(rad_cpa)
-
-                # Calculate the distance from the first observed point to the projected point on the radiant line
-                dist = vectMag(ref_point - rad_cpa)
-                radiant_distances.append(dist)
-
-                # Calculate the distance from the beginning of the trajectory to the projected point
-                beg_dist = vectMag(beg_cpa - rad_cpa)
-                state_vector_distance.append(beg_dist)
-
-
-
-            # Convert the distances (length along the trail) into a numpy array
-            length = np.array(radiant_distances)
-            state_vector_distance = np.array(state_vector_distance)
+            # Calculate the lengths along the trail (the first point is taken as the reference point) and
+            #   the distances from the beginning of the trajectory
+            length, state_vector_distance = calcTrailLengths(rad_cpa_arr, beg_cpa)
 
             self.lengths.append(length)
             self.state_vector_distances.append(state_vector_distance)
 
-
-            # Shift the radiant distances one element down (for difference calculation)
-            dists_shifted = np.r_[0, length][:-1]
-
-            # Calculate distance differences from point to point (first is always 0)
-            dists_diffs = length - dists_shifted
-
-            # Shift the time one element down (for difference calculation)
-            time_shifted = np.r_[0, time_data][:-1]
-
-            # Calculate the time differences from point to point
-            time_diffs = time_data - time_shifted
-
-            # Replace zeros in time by machine precision value to avoid division by zero errors
-            time_diffs[time_diffs == 0] = np.finfo(np.float64).eps
-
             # Calculate velocity for every point
-            velocity = dists_diffs/time_diffs
+            velocity = calcPointVelocities(time_data, length)
 
             self.velocities.append(velocity)
 
@@ -964,34 +1273,35 @@ class GuralTrajectory(object):
             best_stddev = np.inf
             best_solution = None
 
+            # Get the times and lengths from all stations, labelled by station and sorted by time only once
+            all_times = np.concatenate(self.times)
+            all_svs = np.concatenate(self.state_vector_distances)
+            all_stations = np.concatenate([np.full(len(time_dat), k) for k, time_dat in enumerate(self.times)])
+
+            time_order = np.argsort(all_times, kind='stable')
+            all_times = all_times[time_order]
+            all_svs = all_svs[time_order]
+            all_stations = all_stations[time_order]
+
             # If there are more than 2 stations, try all rejecting one until the best velocity fit is found
             for i in range(1, self.maxcameras + 1):
 
-                use_indices = list(range(self.maxcameras))
-
                 # If there are more than 2 stations, reject one station
                 if self.maxcameras > 2 and (i != 0):
-                    use_indices.pop(i - 1)
-
-
-                filtered_times = [time_dat for i, time_dat in enumerate(self.times) if i in use_indices]
-                filtered_svs = [sv_dat for i, sv_dat in enumerate(self.state_vector_distances) if i in use_indices]
+                    station_mask = all_stations != (i - 1)
+                    times = all_times[station_mask]
+                    sv_dists = all_svs[station_mask]
 
-                # Get a list of times and lengths from all stations
-                times = np.array([t for time_dat in filtered_times for t in time_dat]).flatten()
-                sv_dists = np.array([sv for sv_dat in filtered_svs for sv in sv_dat]).flatten()
-
-                # Sort by time
-                temp_arr = np.c_[times, sv_dists]
-                temp_arr = temp_arr[np.argsort(temp_arr[:, 0])]
-                times, sv_dists = temp_arr.T
+                else:
+                    times = all_times
+                    sv_dists = all_svs
 
                 half_index = int(len(times)/2)
                 times_half = times[:half_index]
                 sv_dists_half = sv_dists[:half_index]
 
                 # Fit a line to the first 50% of the points
-                popt, pcov = scipy.optimize.curve_fit(lineFunc, times_half, sv_dists_half)
+                popt, pcov = fitLine(times_half, sv_dists_half)
 
                 # Compute the standard deviation of the fit
                 intercept_stddev = np.sqrt(np.diag(pcov))[1]
@@ -1040,10 +1350,10 @@ class GuralTrajectory(object):
         for time_data, length in zip(self.times, self.lengths):
 
             # Find the lag intercept from the given slope (i.e. initial velocity)
-            lag_line = fitLagIntercept(time_data, length, self.vbegin*1000.0)
+            slope, intercept = fitLagIntercept(time_data, length, self.vbegin*1000.0)
 
             # Calculate the lag
-            lag = length - lineFunc(time_data, *lag_line)
+            lag = length - slope*time_data - intercept
 
             self.lags.append(lag)
 
@@ -1068,32 +1378,23 @@ class GuralTrajectory(object):
             v_avg_list.append((length[-1] - length[0])/(time_data[-1] - time_data[0]))
 
 
-            eci_list = []
-
             # Calculate ECI coordinated for every point on the meteor's track
-            for j in range(self.nummeas_lst[kmeas]):
-
-                eci_list.append(geo2Cartesian(self.model_lat[kmeas][j], self.model_lon[kmeas][j],
-                    1000*self.model_hkm[kmeas][j], self.JD_data_cameras[kmeas][j]))
-
-            eci_list = np.array(eci_list)
+            n = self.nummeas_lst[kmeas]
+            eci_arr = np.array(geo2CartesianBatch(self.model_lat_2d[kmeas, :n], self.model_lon_2d[kmeas, :n],
+                1000*self.model_hkm_2d[kmeas, :n], self.JD_data_cameras[kmeas])).T
 
             # Convert meteor geographical positions to ECI coordinates
-            self.model_eci_cameras.append(eci_list)
+            self.model_eci_cameras.append(eci_arr)
 
 
         # Calculate the average velocity across all stations
         v_avg = np.mean(v_avg_list)
 
         # Calculate average ECI coordinate from all measurements
-        eci_x = [eci_meas[0] for eci_stat_list in self.model_eci_cameras for eci_meas in eci_stat_list]
-        eci_y = [eci_meas[1] for eci_stat_list in self.model_eci_cameras for eci_meas in eci_stat_list]
-        eci_z = [eci_meas[2] for eci_stat_list in self.model_eci_cameras for eci_meas in eci_stat_list]
-
-        eci_avg = np.array([np.mean(eci_x), np.mean(eci_y), np.mean(eci_z)])
+        eci_avg = np.vstack(self.model_eci_cameras).mean(axis=0)
 
-        # Calculate average JD date
-        jd_avg = np.mean([np.mean(jd_data) for jd_data in self.JD_data_cameras])
+        # Calculate average JD date from all measurements
+        jd_avg = self._jd_concat.mean()
 
         return v_avg, eci_avg, jd_avg
 
@@ -1104,29 +1405,36 @@ class GuralTrajectory(object):
     def showPlots(self):
         """ Show plots of the solution. """
 
+        # Matplotlib is only imported when plotting, as importing it is slow
+        import matplotlib.pyplot as plt
+        from matplotlib.pyplot import cm
 
         ### PLOT RESIDUALS
 
-        # Go through every stations
-        for i, (time_data, meas1, model1, meas2, model2) in enumerate(zip(self.times, self.meas1,
-            self.model_fit1, self.meas2, self.model_fit2)):
+        # Number of the station of every measurement
+        station_num = np.repeat(np.arange(1, len(self.times) + 1), [len(time_data) for time_data in self.times])
+
+        meas1, model1 = np.concatenate(self.meas1), np.concatenate(self.model_fit1)
+        meas2, model2 = np.concatenate(self.meas2), np.concatenate(self.model_fit2)
 
-            # Calculate angular deviations in azimuth and elevation
-            elev_res = meas2 - model2
-            azim_res = (np.abs(meas1 - model1)%(2*np.pi))*np.sin(meas2)
+        # Calculate angular deviations in azimuth and elevation
+        elev_res = meas2 - model2
+        azim_res = (np.abs(meas1 - model1)%(2*np.pi))*np.sin(meas2)
 
-            # Calculate the angular residuals from the radiant line
-            ang_res = np.sqrt(elev_res**2 + azim_res**2)
+        # Calculate the angular residuals from the radiant line
+        ang_res = np.sqrt(elev_res**2 + azim_res**2)
 
-            # Recalculate the angular residuals to arcseconds
-            ang_res = np.degrees(ang_res)*3600
+        # Recalculate the angular residuals to arcseconds
+        ang_res = np.degrees(ang_res)*3600
 
-            # Calculate the RMS of the residuals
-            res_rms = round(np.sqrt(np.mean(ang_res**2)), 2)
+        # Calculate the RMS of the residuals of every station
+        res_rms = np.sqrt(np.bincount(station_num - 1, weights=ang_res**2)/np.bincount(station_num - 1))
 
+        # Plot all stations as one collection, colored by the station
+        scat = plt.scatter(np.concatenate(self.times), ang_res, c=station_num, cmap='rainbow', s=2, zorder=3)
 
-            plt.scatter(time_data, ang_res, s=2, zorder=3, label='Station: ' + str(i + 1) + \
-                ', RMS = {:.2f}'.format(res_rms))
+        cbar = plt.colorbar(scat, ticks=np.arange(1, len(self.times) + 1))
+        cbar.set_ticklabels(['Station: {:d}, RMS = {:.2f}'.format(i + 1, rms) for i, rms in enumerate(res_rms)])
 
 
         plt.title('Observed vs. Radiant LoS Residuals, all stations')
@@ -1137,7 +1445,6 @@ class GuralTrajectory(object):
         plt.ylim(ymin=0)
 
         plt.grid()
-        plt.legend()
 
         plt.show()
 
@@ -1177,8 +1484,8 @@ class GuralTrajectory(object):
         for i, (time_obs, vel_obs) in enumerate(zip(self.times, self.velocities)):
 
             # Plot the measured velocity
-            plt.scatter(vel_obs[1:], time_obs[1:], c=colors[i], marker=markers[i%len(markers)], alpha=0.5,
-                label='Measured, station: ' + str(i + 1), zorder=3)
+            plt.plot(vel_obs[1:], time_obs[1:], c=colors[i], linestyle='None', marker=markers[i%len(markers)],
+                alpha=0.5, label='Measured, station: ' + str(i + 1), zorder=3)
 
 
         for i, (time_model, vel_model) in enumerate(zip(self.model_time, self.model_vel)):
@@ -1215,110 +1522,110 @@ class GuralTrajectory(object):
             save_results: [bool] If True, the results will be saved to a file.
         """
         # Format longitude in the -180 to 180 deg range
-        _formatLongitude = lambda x: (x + np.pi)%(2*np.pi) - np.pi
+        _formatLongitude = lambda x: (x + math.pi)%(2*math.pi) - math.pi
 
-        out = 'Input measurement type: '
+        parts = ['Input measurement type: ']
 
         # Write out measurement type
         if self.meastype == 1:
-            out += 'Right Ascension for meas1, Declination for meas2, epoch of date\n'
+            parts.append('Right Ascension for meas1, Declination for meas2, epoch of date\n')
         elif self.meastype == 2:
-            out += 'Azimuth +east of due north for meas1, Elevation angle above the horizon for meas2\n'
+            parts.append('Azimuth +east of due north for meas1, Elevation angle above the horizon for meas2\n')
         elif self.meastype == 3:
-            out += 'Azimuth +west of due south for meas1, Zenith angle for meas2\n'
+            parts.append('Azimuth +west of due south for meas1, Zenith angle for meas2\n')
         elif self.meastype == 4:
-            out += 'Azimuth +north of due east for meas1, Zenith angle for meas2\n'
+            parts.append('Azimuth +north of due east for meas1, Zenith angle for meas2\n')
 
-        out += "\n"
-        out += f'Reference JD: {self.jdt_ref:20.12f}\n'
-        out += f'Time: {str(jd2Date(self.orbit.jd_ref, dt_obj=True))} UTC'
+        parts.append("\n")
+        parts.append(f'Reference JD: {self.jdt_ref:20.12f}\n')
+        parts.append(f'Time: {str(jd2Date(self.orbit.jd_ref, dt_obj=True))} UTC')
 
-        out += '\n\n'
+        parts.append('\n\n')
 
         # gural solver doesn't report all candidates, only selected plane intersection
         # and station ids used are not reported
-        out += 'Plane intersections\n'
-        out += '-------------------\n'
-        out += 'Intersection 1 - Station IDs unavailable\n'
-        out += f' Convergence Angle = {np.degrees(self.max_convergence):.5f} deg\n'
-        out += f' R.A. = {np.degrees(self.ra_radiant_ip):>9.5f}'
-        out += f'  Dec = {np.degrees(self.dec_radiant_ip):>+9.5f} deg\n'
+        parts.append('Plane intersections\n')
+        parts.append('-------------------\n')
+        parts.append('Intersection 1 - Station IDs unavailable\n')
+        parts.append(f' Convergence Angle = {self.max_convergence*_DEG:.5f} deg\n')
+        parts.append(f' R.A. = {self.ra_radiant_ip*_DEG:>9.5f}')
+        parts.append(f'  Dec = {self.dec_radiant_ip*_DEG:>+9.5f} deg\n')
 
-        out += '\n'
-        out += f'Best intersection: Station IDs unavailable with Qconv = {np.degrees(self.max_convergence):.2f} deg\n'
+        parts.append('\n')
+        parts.append(f'Best intersection: Station IDs unavailable with Qconv = {self.max_convergence*_DEG:.2f} deg\n')
 
-        out += '\n\n'
+        parts.append('\n\n')
 
-        out += 'Multi-parameter fit solution\n'
-        out += '----------------------------\n'
+        parts.append('Multi-parameter fit solution\n')
+        parts.append('----------------------------\n')
 
         # gural solver doesn't provide uncertainties for these
         # values out of the solver are in km and km/s
-        out += 'State vector (ECI, epoch of date):\n'
-        out += f' X =  {self.solution[0] * 1000.0:11.2f} m\n'
-        out += f' Y =  {self.solution[1] * 1000.0:11.2f} m\n'
-        out += f' Z =  {self.solution[2] * 1000.0:11.2f} m\n'
-        out += f' Vx = {self.solution[3] * 1000.0:11.2f} m/s\n'
-        out += f' Vy = {self.solution[4] * 1000.0:11.2f} m/s\n'
-        out += f' Vz = {self.solution[5] * 1000.0:11.2f} m/s\n'
+        parts.append('State vector (ECI, epoch of date):\n')
+        parts.append(f' X =  {self.solution[0] * 1000.0:11.2f} m\n')
+        parts.append(f' Y =  {self.solution[1] * 1000.0:11.2f} m\n')
+        parts.append(f' Z =  {self.solution[2] * 1000.0:11.2f} m\n')
+        parts.append(f' Vx = {self.solution[3] * 1000.0:11.2f} m/s\n')
+        parts.append(f' Vy = {self.solution[4] * 1000.0:11.2f} m/s\n')
+        parts.append(f' Vz = {self.solution[5] * 1000.0:11.2f} m/s\n')
 
-        out += '\n'
-        out += 'State vector covariance matrix (X, Y, Z, Vx, Vy, Vz):\n'
-        out += ' Not available\n'
+        parts.append('\n')
+        parts.append('State vector covariance matrix (X, Y, Z, Vx, Vy, Vz):\n')
+        parts.append(' Not available\n')
 
-        out += '\n'
-        out += 'Timing offsets (from input data)\n'
+        parts.append('\n')
+        parts.append('Timing offsets (from input data)\n')
 
         for station_id, toffset in zip(self.station_ids, self.tref_offsets):
-            out += f'{station_id:>14s}: {toffset:.6f}\n'
+            parts.append(f'{station_id:>14s}: {toffset:.6f}\n')
 
         if self.orbit is not None:
-            out += '\n'
-            out += 'Reference point on the trajectory\n'
-            out += f'  Time: {str(jd2Date(self.orbit.jd_ref, dt_obj=True))} UTC\n'
-            out += f'  Lat     = {np.degrees(self.orbit.lat_ref):>11.6f}\n'
-            out += f'  Lon     = {np.degrees(_formatLongitude(self.orbit.lon_ref)):>+11.6}\n'
-            out += f'  Ht      = {self.orbit.ht_ref}\n'
-            out += f'  Lat geo = {np.degrees(self.orbit.lat_geocentric)}\n'
+            parts.append('\n')
+            parts.append('Reference point on the trajectory\n')
+            parts.append(f'  Time: {str(jd2Date(self.orbit.jd_ref, dt_obj=True))} UTC\n')
+            parts.append(f'  Lat     = {self.orbit.lat_ref*_DEG:>11.6f}\n')
+            parts.append(f'  Lon     = {_formatLongitude(self.orbit.lon_ref)*_DEG:>+11.6}\n')
+            parts.append(f'  Ht      = {self.orbit.ht_ref}\n')
+            parts.append(f'  Lat geo = {self.orbit.lat_geocentric*_DEG}\n')
 
             # Write out orbital parameters
-            out += '\n'
-            out += repr(self.orbit)
+            parts.append('\n')
+            parts.append(repr(self.orbit))
 
             # We don't have the orbital covariance matrix so skip it
 
-        out += '\n'
-        out += 'Jacchia fit on lag:\n'
-        out += ' Not available\n'
+        parts.append('\n')
+        parts.append('Jacchia fit on lag:\n')
+        parts.append(' Not available\n')
 
         # Once again heights are in km
-        out += '\n'
-        out += 'Begin point on the trajectory (error estimate at 1.0 sigma):\n'
-        out += f'  Lat = {np.degrees(self.rbeg_lat):>11.6f}'
-        out += f' +/- {np.degrees(self.rbeg_lat_sigma):6.4f} deg\n'
-        out += f'  Lon = {np.degrees(_formatLongitude(self.rbeg_lon)):>+11.6f}'
-        out += f' +/- {np.degrees(self.rbeg_lon_sigma):6.4f} deg\n'
-        out += f'  Ht  = {self.rbeg_hkm * 1000.0:>11.2f}'
-        out += f' +/- {self.rbeg_hkm_sigma * 1000.0:6.2f} m\n'
-
-        out += 'End point on the trajectory:\n'
-        out += f'  Lat = {np.degrees(self.rend_lat):>11.6f}'
-        out += f' +/- {np.degrees(self.rend_lat_sigma):6.4f} deg\n'
-        out += f'  Lon = {np.degrees(_formatLongitude(self.rend_lon)):>+11.6f}'
-        out += f' +/- {np.degrees(self.rend_lon_sigma):6.4f} deg\n'
-        out += f'  Ht  = {self.rend_hkm * 1000.0:>11.2f}'
-        out += f' +/- {self.rend_hkm_sigma * 1000.0:6.2f} m\n'
+        parts.append('\n')
+        parts.append('Begin point on the trajectory (error estimate at 1.0 sigma):\n')
+        parts.append(f'  Lat = {self.rbeg_lat*_DEG:>11.6f}')
+        parts.append(f' +/- {self.rbeg_lat_sigma*_DEG:6.4f} deg\n')
+        parts.append(f'  Lon = {_formatLongitude(self.rbeg_lon)*_DEG:>+11.6f}')
+        parts.append(f' +/- {self.rbeg_lon_sigma*_DEG:6.4f} deg\n')
+        parts.append(f'  Ht  = {self.rbeg_hkm * 1000.0:>11.2f}')
+        parts.append(f' +/- {self.rbeg_hkm_sigma * 1000.0:6.2f} m\n')
+
+        parts.append('End point on the trajectory:\n')
+        parts.append(f'  Lat = {self.rend_lat*_DEG:>11.6f}')
+        parts.append(f' +/- {self.rend_lat_sigma*_DEG:6.4f} deg\n')
+        parts.append(f'  Lon = {_formatLongitude(self.rend_lon)*_DEG:>+11.6f}')
+        parts.append(f' +/- {self.rend_lon_sigma*_DEG:6.4f} deg\n')
+        parts.append(f'  Ht  = {self.rend_hkm * 1000.0:>11.2f}')
+        parts.append(f' +/- {self.rend_hkm_sigma * 1000.0:6.2f} m\n')
 
         ### Write information about stations ###
         ######################################################################################################
-        out += '\n'
-        out += "Stations\n"
-        out += "--------\n"
+        parts.append('\n')
+        parts.append("Stations\n")
+        parts.append("--------\n")
 
         # Note we only have a single global acceleration computation for the entire trajectory
         # not a Jacchia fit for each station's lags as we have with the pylig solver
         # we make do with what we have...
-        out += '            ID, Ignored, Lon +E (deg), Lat +N (deg),  Ht (m),   Accel a1,   Accel a2,  Beg Ht (m),  End Ht (m), +/- Obs ang (deg), +/- V (m), +/- H (m), Persp. angle (deg), Weight, FOV Beg, FOV End, Comment\n'
+        parts.append('            ID, Ignored, Lon +E (deg), Lat +N (deg),  Ht (m),   Accel a1,   Accel a2,  Beg Ht (m),  End Ht (m), +/- Obs ang (deg), +/- V (m), +/- H (m), Persp. angle (deg), Weight, FOV Beg, FOV End, Comment\n')
 
         for cam in range(0, self.num_cameras):
             endpt = self.nummeas_lst[cam] - 1
@@ -1326,13 +1633,13 @@ class GuralTrajectory(object):
             info = []
             info.append(f'{self.station_ids[cam]:>14s}')
             info.append(f'{0:>7d}')
-            info.append(f'{np.degrees(self.camera_lon[cam]):>12.6f}')
-            info.append(f'{np.degrees(self.camera_lat[cam]):>12.6f}')
+            info.append(f'{self.camera_lon[cam]*_DEG:>12.6f}')
+            info.append(f'{self.camera_lat[cam]*_DEG:>12.6f}')
             info.append(f'{self.camera_hkm[cam] * 1000.0:>7.2f}')
             info.append(f'{self.decel1:>10.6f}')
             info.append(f'{self.decel2:>10.6f}')
-            info.append(f'{self.model_hkm[cam][0] * 1000.0:>11.2f}')
-            info.append(f'{self.model_hkm[cam][endpt] * 1000.0:>11.2f}')
+            info.append(f'{self.model_hkm_2d[cam, 0] * 1000.0:>11.2f}')
+            info.append(f'{self.model_hkm_2d[cam, endpt] * 1000.0:>11.2f}')
             info.append(f'{"None":>17s}')
             info.append(f'{"None":>9s}')
             info.append(f'{"None":>9s}')
@@ -1342,118 +1649,101 @@ class GuralTrajectory(object):
             info.append(f'{str(self.fov_end[cam]):>7s}')
             info.append(f'{self.station_comments[cam]:s}')
 
-            out += ', '.join(info) + '\n'
+            parts.append(', '.join(info) + '\n')
 
         ### Write information about individual points ###
         ######################################################################################################
-        out += '\n'
-        out += "Points\n"
-        out += "------\n"
-
-        out += " No, "
-        out += "    Station ID, "
-        out += " Ignore, "
-        out += " Time (s), "
-        out += "                  JD, "
-        out += "    meas1, "
-        out += "    meas2, "
-        out += "Azim +E of due N (deg), "
-        out += "Alt (deg), "
-        out += "Azim line (deg), "
-        out += "Alt line (deg), "
-        out += "RA obs (deg), "
-        out += "Dec obs (deg), "
-        out += "RA line (deg), "
-        out += "Dec line (deg), "
-        out += "      X (m), "
-        out += "      Y (m), "
-        out += "      Z (m), "
-        out += "Latitude (deg), "
-        out += "Longitude (deg), "
-        out += "Height (m), "
-        out += " Range (m), "
-        out += "Length (m), "
-        out += "State vect dist (m), "
-        out += "  Lag (m), "
-        out += "Vel (m/s), "
-        out += "Vel prev avg (m/s), "
-        out += "H res (m), "
-        out += "V res (m), "
-        out += "Ang res (asec), "
-        out += "AppMag, "
-        out += "AbsMag"
-        out += "\n"
+        parts.append('\n')
+        parts.append("Points\n")
+        parts.append("------\n")
+
+        parts.append(" No, ")
+        parts.append("    Station ID, ")
+        parts.append(" Ignore, ")
+        parts.append(" Time (s), ")
+        parts.append("                  JD, ")
+        parts.append("    meas1, ")
+        parts.append("    meas2, ")
+        parts.append("Azim +E of due N (deg), ")
+        parts.append("Alt (deg), ")
+        parts.append("Azim line (deg), ")
+        parts.append("Alt line (deg), ")
+        parts.append("RA obs (deg), ")
+        parts.append("Dec obs (deg), ")
+        parts.append("RA line (deg), ")
+        parts.append("Dec line (deg), ")
+        parts.append("      X (m), ")
+        parts.append("      Y (m), ")
+        parts.append("      Z (m), ")
+        parts.append("Latitude (deg), ")
+        parts.append("Longitude (deg), ")
+        parts.append("Height (m), ")
+        parts.append(" Range (m), ")
+        parts.append("Length (m), ")
+        parts.append("State vect dist (m), ")
+        parts.append("  Lag (m), ")
+        parts.append("Vel (m/s), ")
+        parts.append("Vel prev avg (m/s), ")
+        parts.append("H res (m), ")
+        parts.append("V res (m), ")
+        parts.append("Ang res (asec), ")
+        parts.append("AppMag, ")
+        parts.append("AbsMag")
+        parts.append("\n")
+
+        # Convert the units of the model positions of all cameras at once
+        model_lat_deg_2d = np.degrees(self.model_lat_2d)
+        model_lon_deg_2d = np.degrees(self.model_lon_2d)
+        model_ht_m_2d = self.model_hkm_2d*1000.0
 
         # A number of these fields were never implemented by the GuralTrajectory
-        # solver and are thus omitted here (left as 'None')
+        # solver and are thus omitted here (left as 'None', see REPORT_POINT_FORMAT)
         for cam in range(0, self.num_cameras):
-            for pt in range(0, self.nummeas_lst[cam]):
-                info = []
-                info.append(f'{pt:3d}')
-                info.append(f'{self.station_ids[cam]:>14s}')
-                info.append(f'{0:>7d}')
-
-                info.append(f'{self.model_time[cam][pt]:9.6f}')
-                info.append(f'{self.JD_data_cameras[cam][pt]:20.12f}')
-
-                info.append(f'{np.degrees(self.meas1[cam][pt]):9.5f}')
-                info.append(f'{np.degrees(self.meas2[cam][pt]):9.5f}')
-
-                # Not yet implemented - would need to convert from meas & model
-                # (lat,lon) or ECI coords at each point
-                info.append(f'{"None":>22s}')
-                info.append(f'{"None":>9s}')
-                info.append(f'{"None":>15s}')
-                info.append(f'{"None":>14s}')
-                info.append(f'{"None":>12s}')
-                info.append(f'{"None":>13s}')
-                info.append(f'{"None":>13s}')
-                info.append(f'{"None":>14s}')
-
-                for eci in range(0,3):
-                    info.append(f'{self.model_eci_cameras[cam][pt][eci]:11.2f}')
-
-                info.append(f'{np.degrees(self.model_lat[cam][pt]):14.6f}')
-                info.append(f'{np.degrees(self.model_lon[cam][pt]):+15.6f}')
-                info.append(f'{self.model_hkm[cam][pt] * 1000.0:10.2f}')
-                info.append(f'{self.model_range[cam][pt] * 1000.0:10.2f}')
-
-                info.append(f'{self.lengths[cam][pt]:10.2f}')
-                info.append(f'{self.state_vector_distances[cam][pt]:19.2f}')
-                info.append(f'{self.lags[cam][pt]:9.2f}')
-
-                # velocities_prev_point was never implemented
-                info.append(f'{self.velocities[cam][pt]:9.2f}')
-                info.append(f'{"None":>18s}')
-
-                # residual data are not available
-                info.append(f'{"None":>9s}')
-                info.append(f'{"None":>9s}')
-                info.append(f'{"None":>14s}')
-
-                if self.magnitudes[cam] is not None:
-                    info.append(f'{self.magnitudes[cam][pt]:+6.2f}')
-                else:
-                    info.append(f'{"None":>6s}')
-
-                info.append(f'{"None":>6s}')
-
-                out += ", ".join(info) + '\n'
-
-        out += '\n'
-
-        out += 'Notes\n'
-        out += '-----\n'
-        out += '- Not all fields in this table are presently available using the GuralTrajectory solver, some may be left blank\n'
-        out += '- Points that have not been taken into consideration when computing the trajectory have \'1\' in the \'Ignore\' column.\n'
-        out += '- The time already has time offsets applied to it.\n'
-        out += '- \'meas1\' and \'meas2\' are given input points.\n'
-        out += '- X, Y, Z are ECI (Earth-Centered Inertial) positions of projected lines of sight on the radiant line.\n'
-        out += '- Zc is the observed zenith distance of the entry angle, while the Zg is the entry zenith distance corrected for Earth\'s gravity.\n'
-        out += '- Latitude (deg) and Longitude (deg) are in WGS84 coordinates, while Height (m) is in the EGM96 datum. There values are coordinates of each point on the radiant line.\n'
-        out += '- Jacchia (1955) deceleration equation fit was done on the lag.\n'
-        out += '- Right ascension and declination in the table are given in the epoch of date for the corresponding JD, per every point.\n'
 
+            if self.magnitudes[cam] is not None:
+                magnitudes = [f'{mag:+6.2f}' for mag in self.magnitudes[cam]]
+            else:
+                magnitudes = ['None']*self.nummeas_lst[cam]
+
+            # Convert the units of the whole camera at once
+            meas1_deg = np.degrees(self.meas1[cam])
+            meas2_deg = np.degrees(self.meas2[cam])
+            model_range_m = self.model_range[cam]*1000.0
+            model_eci = self.model_eci_cameras[cam]
+
+            nummeas = self.nummeas_lst[cam]
+
+            # Columns of the table for this camera, converted to lists of Python scalars which format much
+            #   faster than numpy scalars
+            columns = [range(nummeas), [self.station_ids[cam]]*nummeas, [0]*nummeas]
+            columns += [arr[:nummeas].tolist() for arr in (
+                self.model_time_2d[cam], self.JD_data_cameras[cam],
+                meas1_deg, meas2_deg,
+                model_eci[:, 0], model_eci[:, 1], model_eci[:, 2],
+                model_lat_deg_2d[cam], model_lon_deg_2d[cam], model_ht_m_2d[cam], model_range_m,
+                self.lengths[cam], self.state_vector_distances[cam], self.lags[cam],
+                self.velocities[cam])]
+            columns.append(magnitudes)
+
+            # velocities_prev_point, residual data and absolute magnitudes are not available
+            parts.extend([REPORT_POINT_FORMAT % row for row in zip(*columns)])
+
+        parts.append('\n')
+
+        parts.append('Notes\n')
+        parts.append('-----\n')
+        parts.append('- Not all fields in this table are presently available using the GuralTrajectory solver, some may be left blank\n')
+        parts.append('- Points that have not been taken into consideration when computing the trajectory have \'1\' in the \'Ignore\' column.\n')
+        parts.append('- The time already has time offsets applied to it.\n')
+        parts.append('- \'meas1\' and \'meas2\' are given input points.\n')
+        parts.append('- X, Y, Z are ECI (Earth-Centered Inertial) positions of projected lines of sight on the radiant line.\n')
+        parts.append('- Zc is the observed zenith distance of the entry angle, while the Zg is the entry zenith distance corrected for Earth\'s gravity.\n')
+        parts.append('- Latitude (deg) and Longitude (deg) are in WGS84 coordinates, while Height (m) is in the EGM96 datum. There values are coordinates of each point on the radiant line.\n')
+        parts.append('- Jacchia (1955) deceleration equation fit was done on the lag.\n')
+        parts.append('- Right ascension and declination in the table are given in the epoch of date for the corresponding JD, per every point.\n')
+
+
+        out = ''.join(parts)
 
         if verbose:
             print(out)
@@ -1490,82 +1780,96 @@ class GuralTrajectory(object):
 
 
         # ECI coordinates of measurements
-        self.meashat_ECI = double3pointerToArray(self.traj.meashat_ECI, self.maxcameras, self.nummeas_lst, 3)
+        self.meashat_ECI = vectBlockToArrays(self.traj.meashat_block, self.maxcameras, self.nummeas_lst, 3, 4)
 
         # Read out the trajectory solution
-        self.solution = np.copy(npct.as_array((ct.c_double*(9+self.maxcameras)).from_address(ct.addressof(self.traj.solution.contents))))
+        self.solution = double1pointerToArray(self.traj.solution, 9 + self.maxcameras)
 
         # Read out the radiant position (radians)
-        self.ra_radiant = np.frombuffer(self.traj.ra_radiant, float)[0]
-        self.dec_radiant = np.frombuffer(self.traj.dec_radiant, float)[0]
+        self.ra_radiant = self.traj.ra_radiant
+        self.dec_radiant = self.traj.dec_radiant
 
         # Read out the convergence angle (radians)
-        self.max_convergence = np.frombuffer(self.traj.max_convergence, float)[0]
+        self.max_convergence = self.traj.max_convergence
 
         # Read out the intersecting planes radiant (radians)
-        self.ra_radiant_ip = np.frombuffer(self.traj.ra_radiant_IP, float)[0]
-        self.dec_radiant_ip = np.frombuffer(self.traj.dec_radiant_IP, float)[0]
+        self.ra_radiant_ip = self.traj.ra_radiant_IP
+        self.dec_radiant_ip = self.traj.dec_radiant_IP
 
         # Read out beginning velocity
-        self.vbegin = np.frombuffer(self.traj.vbegin, float)[0]
+        self.vbegin = self.traj.vbegin
 
         # Read out deceleration terms
-        self.decel1 = np.frombuffer(self.traj.decel1, float)[0]
-        self.decel2 = np.frombuffer(self.traj.decel2, float)[0]
+        self.decel1 = self.traj.decel1
+        self.decel2 = self.traj.decel2
 
         # Standard deviations of the solution (calculated using Monte Carlo approach)
-        self.ra_sigma = np.frombuffer(self.traj.ra_sigma, float)[0]
-        self.dec_sigma = np.frombuffer(self.traj.dec_sigma, float)[0]
-        self.vbegin_sigma = np.frombuffer(self.traj.vbegin_sigma, float)[0]
-        self.decel1_sigma = np.frombuffer(self.traj.decel1_sigma, float)[0]
-        self.decel2_sigma = np.frombuffer(self.traj.decel2_sigma, float)[0]
+        self.ra_sigma = self.traj.ra_sigma
+        self.dec_sigma = self.traj.dec_sigma
+        self.vbegin_sigma = self.traj.vbegin_sigma
+        self.decel1_sigma = self.traj.decel1_sigma
+        self.decel2_sigma = self.traj.decel2_sigma
+
+        # Read out all measured and modeled arrays, they are stored in one memory block per camera
+        meas_arrays, meas_arrays_2d = measBlockToArrays(self.traj.meas_block, self.maxcameras,
+            self.nummeas_lst)
 
         # Read out the measurement coordinates
-        self.meas1 = double2pointerToArray(self.traj.meas1, self.maxcameras, self.nummeas_lst)
-        self.meas2 = double2pointerToArray(self.traj.meas2, self.maxcameras, self.nummeas_lst)
-        self.dtime = double2pointerToArray(self.traj.dtime, self.maxcameras, self.nummeas_lst)
-        self.meas_lat = double2pointerToArray(self.traj.meas_lat, self.maxcameras, self.nummeas_lst)
-        self.meas_lon = double2pointerToArray(self.traj.meas_lon, self.maxcameras, self.nummeas_lst)
-        self.meas_hkm = double2pointerToArray(self.traj.meas_hkm, self.maxcameras, self.nummeas_lst)
-        self.meas_range = double2pointerToArray(self.traj.meas_range, self.maxcameras, self.nummeas_lst)
-        self.meas_vel = double2pointerToArray(self.traj.meas_vel, self.maxcameras, self.nummeas_lst)
+        self.meas1 = meas_arrays['meas1']
+        self.meas2 = meas_arrays['meas2']
+        self.dtime = meas_arrays['dtime']
+        self.meas_lat = meas_arrays['meas_lat']
+        self.meas_lon = meas_arrays['meas_lon']
+        self.meas_hkm = meas_arrays['meas_hkm']
+        self.meas_range = meas_arrays['meas_range']
+        self.meas_vel = meas_arrays['meas_vel']
 
         # Read in the time differences
         self.tref_offsets = double1pointerToArray(self.traj.tref_offsets, self.maxcameras)
 
         # Read of modeled coordinates
-        self.model_lat = double2pointerToArray(self.traj.model_lat, self.maxcameras, self.nummeas_lst)
-        self.model_lon = double2pointerToArray(self.traj.model_lon, self.maxcameras, self.nummeas_lst)
-        self.model_hkm = double2pointerToArray(self.traj.model_hkm, self.maxcameras, self.nummeas_lst)
-        self.model_range = double2pointerToArray(self.traj.model_range, self.maxcameras, self.nummeas_lst)
-        self.model_vel = double2pointerToArray(self.traj.model_vel, self.maxcameras, self.nummeas_lst)
+        self.model_lat = meas_arrays['model_lat']
+        self.model_lon = meas_arrays['model_lon']
+        self.model_hkm = meas_arrays['model_hkm']
+        self.model_range = meas_arrays['model_range']
+        self.model_vel = meas_arrays['model_vel']
 
         # Read out vectors of modeled data (model time is relative to jdt_ref)
-        self.model_fit1 = double2pointerToArray(self.traj.model_fit1, self.maxcameras, self.nummeas_lst)
-        self.model_fit2 = double2pointerToArray(self.traj.model_fit2, self.maxcameras, self.nummeas_lst)
-        self.model_time = double2pointerToArray(self.traj.model_time, self.maxcameras, self.nummeas_lst)
+        self.model_fit1 = meas_arrays['model_fit1']
+        self.model_fit2 = meas_arrays['model_fit2']
+        self.model_time = meas_arrays['model_time']
+
+        # Keep the padded #cameras x #measurements versions of the model positions and times
+        self.model_lat_2d = meas_arrays_2d['model_lat']
+        self.model_lon_2d = meas_arrays_2d['model_lon']
+        self.model_hkm_2d = meas_arrays_2d['model_hkm']
+        self.model_time_2d = meas_arrays_2d['model_time']
+        self.meas_mask = np.arange(self.model_lat_2d.shape[1]) < np.array(self.nummeas_lst)[:, None]
 
         # Read out begin point
-        self.rbeg_lat = np.frombuffer(self.traj.rbeg_lat, float)[0]
-        self.rbeg_lon = np.frombuffer(self.traj.rbeg_lon, float)[0]
-        self.rbeg_hkm = np.frombuffer(self.traj.rbeg_hkm, float)[0]
-        self.rbeg_lat_sigma = np.frombuffer(self.traj.rbeg_lat_sigma, float)[0]
-        self.rbeg_lon_sigma = np.frombuffer(self.traj.rbeg_lon_sigma, float)[0]
-        self.rbeg_hkm_sigma = np.frombuffer(self.traj.rbeg_hkm_sigma, float)[0]
+        self.rbeg_lat = self.traj.rbeg_lat
+        self.rbeg_lon = self.traj.rbeg_lon
+        self.rbeg_hkm = self.traj.rbeg_hkm
+        self.rbeg_lat_sigma = self.traj.rbeg_lat_sigma
+        self.rbeg_lon_sigma = self.traj.rbeg_lon_sigma
+        self.rbeg_hkm_sigma = self.traj.rbeg_hkm_sigma
 
         # Read out end point
-        self.rend_lat = np.frombuffer(self.traj.rend_lat, float)[0]
-        self.rend_lon = np.frombuffer(self.traj.rend_lon, float)[0]
-        self.rend_hkm = np.frombuffer(self.traj.rend_hkm, float)[0]
-        self.rend_lat_sigma = np.frombuffer(self.traj.rend_lat_sigma, float)[0]
-        self.rend_lon_sigma = np.frombuffer(self.traj.rend_lon_sigma, float)[0]
-        self.rend_hkm_sigma = np.frombuffer(self.traj.rend_hkm_sigma, float)[0]
+        self.rend_lat = self.traj.rend_lat
+        self.rend_lon = self.traj.rend_lon
+        self.rend_hkm = self.traj.rend_hkm
+        self.rend_lat_sigma = self.traj.rend_lat_sigma
+        self.rend_lon_sigma = self.traj.rend_lon_sigma
+        self.rend_hkm_sigma = self.traj.rend_hkm_sigma
+
         ###
 
         print('Freeing trajectory structure...')
 
-        # Free memory for trajectory
-        self.traj_lib.FreeTrajectoryStructure(self.traj)
+        # Free memory for trajectory (a shared structure is freed by its owner, the memory of the cameras is
+        #   released when the structure is reset for the next solution)
+        if not self.shared_traj:
+            self.traj_lib.FreeTrajectoryStructure(self.traj)
 
         # Delete all library bindings and ctypes variables, so the object can be pickled
         del self.traj_lib
@@ -1599,7 +1903,7 @@ class GuralTrajectory(object):
         v_avg, eci_avg, jd_avg = self.calcAverages()
 
         # Get the first Julian date of all observations
-        jd_first = np.min([np.min(jd_data) for jd_data in self.JD_data_cameras])
+        jd_first = self._jd_concat.min()
 
 
         # Calculate the orbit
@@ -1665,6 +1969,7 @@ class GuralTrajectory(object):
 
 if __name__ == "__main__":
 
+    import matplotlib.pyplot as plt
 
 
     ### TEST DATA
@@ -1688,27 +1993,23 @@ if __name__ == "__main__":
     phi2 = np.array([53.277395606543514, 53.378894622674743, 53.479956569118926, 53.581583564486643, 53.684034387407628, 53.785592745520816, 53.888221858788505, 53.989652095989705, 54.091286379162753, 54.193602941001174, 54.295489508972871, 54.39680492261197, 54.498476109777449, 54.600324950506916, 54.701540003200897, 54.803176858628973, 54.905770160432461, 55.007812728006726, 55.109255891578165, 55.210470634952003, 55.311514652098822, 55.413530094031998, 55.515323573286715, 55.616651349503798, 55.718365072619598, 55.81929890161981, 55.920171553847844, 56.021613048812512, 56.122821258097112, 56.224678899349627, 56.325865881424491, 56.426926299896216, 56.52861756575669, 56.629470224659684, 56.730172326265581, 56.831015465257991, 56.932197458064081, 57.033194520779368, 57.133991458819061, 57.234684773453658, 57.334955465097238, 57.435791110725937, 57.536108210586804, 57.63636328763743, 57.736907767451896, 57.837175586955425, 57.937203809457536, 58.036781893703278, 58.136978754564268, 58.236686044195643, 58.336377908906051, 58.43535465814314, 58.534625554011399, 58.6333660935654, 58.732691095623927, 58.831079484821906, 58.928886668384948, 59.026971367888081, 59.124250755486784, 59.221517041956538, 59.318507836373392, 59.414909920684529, 59.512434568208263, 59.608138099768297, 59.703628259049658, 59.799124823225796, 59.891752747734891, 59.983964699509606, 60.075068063440163, 60.161279720285414])
     theta2 = np.array([101.53457826463746, 101.51641844358608, 101.49838475808278, 101.48029817266169, 101.46211330853345, 101.44413445103872, 101.42601386963629, 101.40815190889943, 101.3903005255073, 101.37237603253595, 101.35457316211422, 101.3369156085497, 101.3192413904863, 101.30158154144411, 101.28407617303588, 101.26654229652355, 101.24888830028594, 101.23137351945253, 101.21400528102164, 101.19671926225118, 101.17950508630588, 101.16216841059016, 101.14491224554251, 101.12777721128521, 101.1106189746513, 101.09363369919245, 101.07669966495487, 101.05971116018192, 101.04280246671952, 101.02582610588094, 101.00900182871261, 100.99223844387629, 100.97541036501492, 100.95876039276899, 100.94217411607163, 100.92560326192354, 100.90901536078817, 100.89249613221422, 100.87604760647557, 100.85965363121295, 100.84336561880852, 100.82702299646236, 100.81080116796716, 100.79462576794111, 100.77843999684811, 100.76233476558444, 100.74630362442984, 100.73037973345876, 100.71439203286904, 100.69851722922239, 100.68267935704768, 100.66698899065921, 100.65128571495896, 100.63569963309027, 100.62005459779738, 100.60458982468012, 100.58924850257456, 100.57389559776691, 100.5587001573241, 100.5435378536578, 100.52844926863388, 100.51348253940968, 100.49837205688057, 100.48357341370303, 100.46883689073712, 100.45412830754735, 100.43988903856147, 100.42574044202429, 100.41178798399015, 100.39860839656382])
 
-    # NOTE: For some reason, you can't do this: theta1 = npct.as_ctypes(theta1). For some reason, the memory
-    # is not well allocated in that case...
-    # The conversion must be done directly upon calling a function.
+    # NOTE: The measurements are passed as numpy arrays, infillTrajectory passes pointers to their
+    # (C-contiguous float64) data to the library, which copies them into the trajectory structure.
 
-    # Convert measurement to radians
-    theta1 = np.radians(theta1)
-    phi1 = np.radians(phi1)
-
-    theta2 = np.radians(theta2)
-    phi2 = np.radians(phi2)
+    # Convert measurement to radians (in place, the arrays are kept as separate contiguous arrays for ctypes)
+    for meas in (theta1, phi1, theta2, phi2):
+        np.radians(meas, out=meas)
 
     ###
 
     ### SITES INFO
 
-    lon1 = np.radians(-80.772090)
-    lat1 = np.radians(43.264200)
+    lon1 = math.radians(-80.772090)
+    lat1 = math.radians(43.264200)
     ele1 = 329.0
 
-    lon2 = np.radians(-81.315650)
-    lat2 = np.radians(43.192790)
+    lon2 = math.radians(-81.315650)
+    lat2 = math.radians(43.192790)
     ele2 = 324.0
 
 
@@ -1726,41 +2027,63 @@ if __name__ == "__main__":
     traj_solve.infillTrajectory(theta2, phi2, time2, lat2, lon2, ele2)
 
 
-    t1 = time.clock()
+    t1 = time.perf_counter_ns()
 
     # Solve the trajectory
     traj_solve.run()
 
-    print('Run time:', time.clock() - t1)
+    print('Run time: {:.6f} s'.format((time.perf_counter_ns() - t1)*1e-9))
 
 
     #sys.exit()
 
     ##########################################################################################################
 
-    site_id = 0
+    @njit(cache=True)
+    def _residualDistances(r1, theta1, phi1, r2, theta2, phi2):
+        """ Distances between two sets of points in spherical coordinates (see sphericalToCartesian),
+            converted and subtracted in a single pass.
+        """
 
-    meas_x, meas_y, meas_z = sphericalToCartesian(traj_solve.meas_hkm[site_id]*1000, traj_solve.meas_lat[site_id], traj_solve.meas_lon[site_id])
-    model_x, model_y, model_z = sphericalToCartesian(traj_solve.model_hkm[site_id]*1000, traj_solve.model_lat[site_id], traj_solve.model_lon[site_id])
+        n = r1.shape[0]
 
-    # Calculate the residual distance
-    residual_dist = np.sqrt((meas_x - model_x)**2 + (meas_y - model_y)**2 + (meas_z - model_z)**2)
+        dist = np.empty(n)
 
-    plt.plot(time1, residual_dist)
+        for i in range(n):
 
-    plt.ylim([0, 10])
+            sin_theta1 = np.sin(theta1[i])
+            sin_theta2 = np.sin(theta2[i])
 
-    plt.show()
-    plt.clf()
+            dx = r1[i]*sin_theta1*np.cos(phi1[i]) - r2[i]*sin_theta2*np.cos(phi2[i])
+            dy = r1[i]*sin_theta1*np.sin(phi1[i]) - r2[i]*sin_theta2*np.sin(phi2[i])
+            dz = r1[i]*np.cos(theta1[i]) - r2[i]*np.cos(theta2[i])
+
+            dist[i] = np.sqrt(dx**2 + dy**2 + dz**2)
+
+        return dist
+
+
+    site_id = 0
+
+    # Calculate the residual distance between the measured and the modelled positions
+    residual_dist = _residualDistances(
+        traj_solve.meas_hkm[site_id]*1000, traj_solve.meas_lat[site_id], traj_solve.meas_lon[site_id],
+        traj_solve.model_hkm[site_id]*1000, traj_solve.model_lat[site_id], traj_solve.model_lon[site_id])
+
+    # Show the residuals and the velocities side by side on one figure, so it is only rendered once
+    fig, (ax_res, ax_vel) = plt.subplots(ncols=2)
+
+    ax_res.plot(time1, residual_dist)
 
+    ax_res.set_ylim([0, 10])
 
 
-    plt.scatter(traj_solve.meas_vel[0], time1, marker='+')
-    plt.scatter(traj_solve.meas_vel[1], time2, marker='x')
+    ax_vel.plot(traj_solve.meas_vel[0], time1, linestyle='None', marker='+')
+    ax_vel.plot(traj_solve.meas_vel[1], time2, linestyle='None', marker='x')
 
-    plt.gca().invert_yaxis()
+    ax_vel.invert_yaxis()
 
-    plt.xlim([traj_solve.vbegin-3, traj_solve.vbegin+3])
+    ax_vel.set_xlim([traj_solve.vbegin-3, traj_solve.vbegin+3])
 
 
     plt.show()
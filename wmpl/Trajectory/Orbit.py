@@ -193,6 +193,18 @@ class Orbit(object):
             self.b = calcLatitudeOfPerihelion(self.peri, self.node, self.i)
 
 
+    def __setstate__(self, state):
+        """ Restore the orbit when it is unpickled, computing the parameters missing in old orbit objects.
+
+        Arguments:
+            state: [dict] Dictionary of the pickled attributes.
+        """
+
+        self.__dict__.update(state)
+
+        self.fixMissingParameters()
+
+
     def __repr__(self, uncertainties=None, v_init_ht=None):
         """ String to be printed out when the Orbit object is printed. """
 
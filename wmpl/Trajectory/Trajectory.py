@@ -2746,6 +2746,32 @@ class Trajectory(object):
         self.phase_1_only = False
 
 
+    def __setstate__(self, state):
+        """ Restore the trajectory when it is unpickled, fixing attribute compatibility with pickles saved by
+            older versions.
+
+        Arguments:
+            state: [dict] Dictionary of the pickled attributes.
+        """
+
+        self.__dict__.update(state)
+
+        # Older versions had a typo "uncertanties", keep both names
+        if "uncertainties" in state:
+            self.uncertanties = self.uncertainties
+
+        elif "uncertanties" in state:
+            self.uncertainties = self.uncertanties
+
+        # If the gravity factor is missing, add it
+        if "gravity_factor" not in state:
+            self.gravity_factor = 1.0
+
+        # If v0z is missing, add it
+        if "v0z" not in state:
+            self.v0z = 0.0
+
+
     def generateFileName(self):
         """ Generate a file name for saving results using the reference julian date. """
 
@@ -3447,6 +3447,8 @@ int  kcamera, maxparams;
     traj->xguess         =   (double*) malloc( maxparams  * sizeof( double  ) );
     traj->xshift         =   (double*) malloc( maxparams  * sizeof( double  ) );
 
+    traj->meas_block     =  (double**) malloc( maxcameras * sizeof( double* ) );
+
     traj->meas1          =  (double**) malloc( maxcameras * sizeof( double* ) );
     traj->meas2          =  (double**) malloc( maxcameras * sizeof( double* ) );
     traj->dtime          =  (double**) malloc( maxcameras * sizeof( double* ) );
@@ -3472,6 +3474,9 @@ int  kcamera, maxparams;
     traj->meashat_ECI    = (double***) malloc( maxcameras * sizeof( double**) );
     traj->rcamera_ECI    = (double***) malloc( maxcameras * sizeof( double**) );
 
+    traj->meashat_block  =  (double**) malloc( maxcameras * sizeof( double* ) );
+    traj->rcamera_block  =  (double**) malloc( maxcameras * sizeof( double* ) );
+
 
 
     if( traj->camera_lat     == NULL  ||
@@ -3486,6 +3491,7 @@ int  kcamera, maxparams;
         traj->xguess         == NULL  ||
         traj->xshift         == NULL  ||
         traj->malloced       == NULL  ||
+        traj->meas_block     == NULL  ||
         traj->meas1          == NULL  ||
         traj->meas2          == NULL  ||
         traj->dtime          == NULL  ||
@@ -3505,7 +3511,9 @@ int  kcamera, maxparams;
         traj->model_fit2     == NULL  ||
         traj->model_time     == NULL  ||
         traj->rcamera_ECI    == NULL  ||
-        traj->meashat_ECI    == NULL      )  {
+        traj->meashat_ECI    == NULL  ||
+        traj->rcamera_block  == NULL  ||
+        traj->meashat_block  == NULL      )  {
 
         printf("ERROR--> Memory not allocated for vectors and arrays in InitTrajectoryStructure\n");
         Delay_msec(15000);
@@ -3535,7 +3543,8 @@ void    FreeTrajectoryStructure( struct trajectory_info *traj )
 
     ResetTrajectoryStructure( 0.0, 0.0, 0, 0, 0, 0, traj );
 
-    free( traj->meas1          );     //... Now free up the row dimension of the 2D arrays
+    free( traj->meas_block     );     //... Now free up the row dimension of the 2D arrays
+    free( traj->meas1          );
     free( traj->meas2          );
     free( traj->dtime          );
     free( traj->noise          );
@@ -3560,6 +3569,9 @@ void    FreeTrajectoryStructure( struct trajectory_info *traj )
     free( traj->rcamera_ECI    );
     free( traj->meashat_ECI    );
 
+    free( traj->rcamera_block  );
+    free( traj->meashat_block  );
+
     free( traj->malloced       );
 
 
@@ -3588,7 +3600,7 @@ void    ResetTrajectoryStructure( double jdt_ref, double max_toffset,
                                   int velmodel, int nummonte, int meastype, int verbose,
                                   struct trajectory_info *traj )
 {
-int  kcamera, kmeas;
+int  kcamera;
 
 
     //======== Set up some initial parameters for this trajectory solution
@@ -3613,33 +3625,15 @@ int  kcamera, kmeas;
 
         if( traj->malloced[kcamera] == 1 )  {
 
-            free( traj->meas1[kcamera]          );
-            free( traj->meas2[kcamera]          );
-            free( traj->dtime[kcamera]          );
-            free( traj->noise[kcamera]          );
-            free( traj->weight[kcamera]         );
-
-            free( traj->meas_lat[kcamera]       );
-            free( traj->meas_lon[kcamera]       );
-            free( traj->meas_hkm[kcamera]       );
-            free( traj->meas_range[kcamera]     );
-            free( traj->meas_vel[kcamera]       );
-
-            free( traj->model_lat[kcamera]      );
-            free( traj->model_lon[kcamera]      );
-            free( traj->model_hkm[kcamera]      );
-            free( traj->model_range[kcamera]    );
-            free( traj->model_vel[kcamera]      );
+            //... all the 2D array columns of this camera share the same memory block
 
-            free( traj->model_fit1[kcamera]     );
-            free( traj->model_fit2[kcamera]     );
-            free( traj->model_time[kcamera]     );
+            free( traj->meas_block[kcamera]     );
 
-            //... free first the 3rd dimension (XYZ or XYZT) of rcamera_ECI and meashat_ECI 
-			//       then free the 2nd measurement dimension
+            //... free first the 3rd dimension (XYZ or XYZT) of rcamera_ECI and meashat_ECI, which are
+			//       backed by one block per camera, then free the 2nd measurement dimension
 
-            for( kmeas=0; kmeas<traj->nummeas[kcamera]; kmeas++ )  free( traj->rcamera_ECI[kcamera][kmeas] );
-            for( kmeas=0; kmeas<traj->nummeas[kcamera]; kmeas++ )  free( traj->meashat_ECI[kcamera][kmeas] );
+            free( traj->rcamera_block[kcamera] );
+            free( traj->meashat_block[kcamera] );
 
             free( traj->rcamera_ECI[kcamera] );
             free( traj->meashat_ECI[kcamera] );
@@ -3719,29 +3713,40 @@ int  kmeas;
     }
 
 
-    //======== Allocate memory through all the working arrays of this camera index
+    //======== Allocate one contiguous memory block for all the working arrays of this camera index
+    //              and point each array column to its own row of the block (see "meas_block")
+
+    traj->meas_block[kcamera]     = (double*) malloc( NMEAS_ARRAYS * nummeas * sizeof(double) );
+
+    if( traj->meas_block[kcamera] == NULL )  {
+
+        printf("ERROR--> Memory not allocated for meas_block in AllocateTrajectoryMemory4Infill\n");
+		Delay_msec(15000);
+        exit(1);
+
+    }
 
-    traj->meas1[kcamera]          = (double*) malloc( nummeas * sizeof(double) );
-    traj->meas2[kcamera]          = (double*) malloc( nummeas * sizeof(double) );
-    traj->dtime[kcamera]          = (double*) malloc( nummeas * sizeof(double) );
-    traj->noise[kcamera]          = (double*) malloc( nummeas * sizeof(double) );
-    traj->weight[kcamera]         = (double*) malloc( nummeas * sizeof(double) );
+    traj->meas1[kcamera]          = traj->meas_block[kcamera] +  0 * nummeas;
+    traj->meas2[kcamera]          = traj->meas_block[kcamera] +  1 * nummeas;
+    traj->dtime[kcamera]          = traj->meas_block[kcamera] +  2 * nummeas;
+    traj->noise[kcamera]          = traj->meas_block[kcamera] +  3 * nummeas;
+    traj->weight[kcamera]         = traj->meas_block[kcamera] +  4 * nummeas;
 
-    traj->meas_lat[kcamera]       = (double*) malloc( nummeas * sizeof(double) );
-    traj->meas_lon[kcamera]       = (double*) malloc( nummeas * sizeof(double) );
-    traj->meas_hkm[kcamera]       = (double*) malloc( nummeas * sizeof(double) );
-    traj->meas_range[kcamera]     = (double*) malloc( nummeas * sizeof(double) );
-    traj->meas_vel[kcamera]       = (double*) malloc( nummeas * sizeof(double) );
+    traj->meas_lat[kcamera]       = traj->meas_block[kcamera] +  5 * nummeas;
+    traj->meas_lon[kcamera]       = traj->meas_block[kcamera] +  6 * nummeas;
+    traj->meas_hkm[kcamera]       = traj->meas_block[kcamera] +  7 * nummeas;
+    traj->meas_range[kcamera]     = traj->meas_block[kcamera] +  8 * nummeas;
+    traj->meas_vel[kcamera]       = traj->meas_block[kcamera] +  9 * nummeas;
 
-    traj->model_lat[kcamera]      = (double*) malloc( nummeas * sizeof(double) );
-    traj->model_lon[kcamera]      = (double*) malloc( nummeas * sizeof(double) );
-    traj->model_hkm[kcamera]      = (double*) malloc( nummeas * sizeof(double) );
-    traj->model_range[kcamera]    = (double*) malloc( nummeas * sizeof(double) );
-    traj->model_vel[kcamera]      = (double*) malloc( nummeas * sizeof(double) );
+    traj->model_lat[kcamera]      = traj->meas_block[kcamera] + 10 * nummeas;
+    traj->model_lon[kcamera]      = traj->meas_block[kcamera] + 11 * nummeas;
+    traj->model_hkm[kcamera]      = traj->meas_block[kcamera] + 12 * nummeas;
+    traj->model_range[kcamera]    = traj->meas_block[kcamera] + 13 * nummeas;
+    traj->model_vel[kcamera]      = traj->meas_block[kcamera] + 14 * nummeas;
 
-    traj->model_fit1[kcamera]     = (double*) malloc( nummeas * sizeof(double) );
-    traj->model_fit2[kcamera]     = (double*) malloc( nummeas * sizeof(double) );
-    traj->model_time[kcamera]     = (double*) malloc( nummeas * sizeof(double) );
+    traj->model_fit1[kcamera]     = traj->meas_block[kcamera] + 15 * nummeas;
+    traj->model_fit2[kcamera]     = traj->meas_block[kcamera] + 16 * nummeas;
+    traj->model_time[kcamera]     = traj->meas_block[kcamera] + 17 * nummeas;
 
     traj->rcamera_ECI[kcamera]    = (double**) malloc( nummeas * sizeof(double*) );
     traj->meashat_ECI[kcamera]    = (double**) malloc( nummeas * sizeof(double*) );
@@ -3776,18 +3781,22 @@ int  kmeas;
     }
 
     //======== Allocate the 3rd dimension for components XYZT of the measurement unit vectors
-    //              and the 3rd dimension for components XYZ  of the camera site vectors
+    //              and the 3rd dimension for components XYZ  of the camera site vectors, as one
+    //              contiguous block per camera with each measurement pointing to its own row
 
-    for( kmeas=0; kmeas<nummeas; kmeas++ )  {
+    traj->rcamera_block[kcamera] = (double*) malloc( 3 * nummeas * sizeof(double) );
+    traj->meashat_block[kcamera] = (double*) malloc( 4 * nummeas * sizeof(double) );
 
-        traj->rcamera_ECI[kcamera][kmeas] = (double*) malloc( 3 * sizeof(double) );
-        traj->meashat_ECI[kcamera][kmeas] = (double*) malloc( 4 * sizeof(double) );
+    if( traj->meashat_block[kcamera] == NULL  ||  traj->rcamera_block[kcamera] == NULL )  {
+        printf("ERROR--> Memory not allocated for meashat_ECI or rcamera_ECI in AllocateTrajectoryMemory4Infill\n");
+		Delay_msec(15000);
+        exit(1);
+    }
 
-        if( traj->meashat_ECI[kcamera][kmeas] == NULL  ||  traj->rcamera_ECI[kcamera][kmeas] == NULL )  {
-            printf("ERROR--> Memory not allocated for meashat_ECI or rcamera_ECIin AllocateTrajectoryMemory4Infill\n");
-			Delay_msec(15000);
-            exit(1);
-        }
+    for( kmeas=0; kmeas<nummeas; kmeas++ )  {
+
+        traj->rcamera_ECI[kcamera][kmeas] = traj->rcamera_block[kcamera] + 3 * kmeas;
+        traj->meashat_ECI[kcamera][kmeas] = traj->meashat_block[kcamera] + 4 * kmeas;
 
     }
 
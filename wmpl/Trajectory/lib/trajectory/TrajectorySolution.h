@@ -203,6 +203,8 @@
 #define   NFIT_TYPES    4   // = last "fit" mnemonic token value + 1
 #define   NPSO_CALLS    6   // # unique ParameterRefinementViaPSO calls in trajectory
 
+#define   NMEAS_ARRAYS  18  // # of #cameras x #measurements arrays backed by "meas_block"
+
 #define   LLA_BEG       0   // "LLA_position"  extreme begin or end point
 #define   LLA_END       1
 
@@ -298,9 +300,15 @@ struct trajectory_info
     double   *camera_hkm;        // Vector of camera heights in km above a WGS84 ellipsoid (GPS height)
     double   *camera_LST;        // Vector of local sidereal times for each camera (based on jdt_ref)
     double ***rcamera_ECI;       // Camera site ECI radius vector from Earth center (#cameras x #measurements x XYZ)
+    double  **rcamera_block;     // Contiguous memory block per camera backing rcamera_ECI (#measurements x XYZ)
 
     //----------------------------- Measurement information
     int      *nummeas;           // Vector containing the number of measurements per camera
+    double  **meas_block;        // Contiguous memory block per camera backing all of the #cameras x
+                                 //    #measurements arrays, NMEAS_ARRAYS rows of #measurements each in the
+                                 //    order: meas1, meas2, dtime, noise, weight, meas_lat, meas_lon,
+                                 //    meas_hkm, meas_range, meas_vel, model_lat, model_lon, model_hkm,
+                                 //    model_range, model_vel, model_fit1, model_fit2, model_time
 
                                  // ------The following are dimensioned #cameras x #measurements(for that camera)
     double  **meas1;             // Array of 1st measurement type (see meastype), typically RA, typically in radians
@@ -312,6 +320,7 @@ struct trajectory_info
     double ***meashat_ECI;       // Measurement ray unit vectors (#cameras x #measurements x XYZT)
 	                             //    XYZ in is Earth Centered Inertial (ECI) coordinates
 	                             //    T is dtime minus the reference time dtime_ref
+    double  **meashat_block;     // Contiguous memory block per camera backing meashat_ECI (#measurements x XYZT)
     double    ttbeg;             // Begin position time relative to ref time dtime_ref 
     double    ttend;             // End position time relative to ref time dtime_ref
 	double    ttzero;            // Tzero model start time relative to ref time dtime_ref
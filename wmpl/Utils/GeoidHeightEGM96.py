@@ -89,6 +89,32 @@ def mslToWGS84Height(lat, lon, msl_height):
 
 
 
+def mslToWGS84Height_vect(lat, lon, msl_height):
+    """ Vectorized version of mslToWGS84Height, the geoid model is evaluated at all points in one call.
+    
+    Arguments:
+        lat: [ndarray] Latitudes +N (rad).
+        lon: [ndarray] Longitudes +E (rad).
+        msl_height: [ndarray] Heights above sea level (meters).
+
+    Return:
+        wgs84_height: [ndarray] Heights above the WGS84 ellipsoid.
+
+    """
+
+    # Get the difference between WGS84 and MSL height at every point
+    lat_mod = np.pi/2 - np.asarray(lat, dtype=np.float64)
+    lon_mod = np.asarray(lon, dtype=np.float64)%(2*np.pi)
+    msl_ht_diff = GEOID_MODEL(lat_mod, lon_mod, grid=False)
+
+    # Compute the WGS84 height
+    wgs84_height = msl_height + msl_ht_diff
+
+
+    return wgs84_height
+
+
+
 def wgs84toMSLHeight(lat, lon, wgs84_height):
     """ Given the height above the WGS84 ellipsoid compute the height above sea level (using the EGM96 model).
     
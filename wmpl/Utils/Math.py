@@ -481,6 +481,65 @@ def findClosestPoints(P, u, Q, v):
     return S, T, d
 
 
+
+def findClosestPoints_vect(P, u, Q, v):
+    """ Vectorized version of findClosestPoints, where the 1st observer's positions and direction vectors are
+        given as arrays (e.g. every measurement of a station) and the 2nd line is fixed (e.g. the radiant line).
+
+    Arguments:
+        P: [ndarray] (N, 3) array of position coordinates of the 1st observer
+        u: [ndarray] (N, 3) array of 1st observer's direction vectors
+        Q: [3 element vector] position coordinates of the 2nd observer
+        v: [3 element vector] 2nd observer's direction vector
+
+    Return:
+        S: [ndarray] (N, 3) points on the 1st observer's LoS closest to the 2nd observer's LoS
+        T: [ndarray] (N, 3) points on the 2nd observer's LoS closest to the 1st observer's LoS
+        d: [ndarray] N distances between S and T
+
+    """
+
+    P = np.asarray(P, dtype=np.float64).reshape(-1, 3)
+    u = np.asarray(u, dtype=np.float64).reshape(-1, 3)
+    Q = np.asarray(Q, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+
+    # Calculate the difference in position between the observers
+    w = P - Q
+
+    # Calculate cosines of angles between various vectors
+    a = np.einsum('ij,ij->i', u, u)
+    b = u.dot(v)
+    c = np.dot(v, v)
+    d = np.einsum('ij,ij->i', u, w)
+    e = w.dot(v)
+
+    # Calculate the denominator
+    denom = (a*c - b**2)
+
+    # Lines which are close to parallel will have the closest points set to infinity
+    parallel = np.abs(denom) < 1e-10
+    denom[parallel] = 1.0
+
+    sc = (b*e - c*d)/denom
+    tc = (a*e - b*d)/denom
+
+    # Points on the 1st observer's line of sight closest to the LoS of the 2nd observer
+    S = P + u*sc[:, np.newaxis]
+
+    # Points on the 2nd observer's line of sight closest to the LoS of the 1st observer
+    T = Q + np.outer(tc, v)
+
+    S[parallel] = np.inf
+    T[parallel] = np.inf
+
+    # Calculate the distances between S and T
+    d = np.linalg.norm(S - T, axis=1)
+    d[parallel] = np.inf
+
+    return S, T, d
+
+
 def lineAndSphereIntersections(centre, radius, origin, direction):
     """Finds intersections between a sphere of given radius and coordiantes of the centre and a line
         defined by an origin and a direction vector.
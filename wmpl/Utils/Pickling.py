@@ -5,13 +5,61 @@ from __future__ import print_function, absolute_import
 import os
 import sys
 import pickle
+import functools
 
 
 from wmpl.Utils.OSTools import mkdirP
+from wmpl.Utils.PyDomainParallelizer import domainParallelizer
 
 
+# Pickle protocol used for saving. Protocol 5 (Python 3.8+) stores numpy arrays as raw buffers, while
+#   protocol 2 (the only one readable by Python 2) encodes every array as a latin1 string. The loading function
+#   is chosen once as well, in Python 3 older pickles from Python 2 are decoded as latin1
+if sys.version_info[0] < 3:
+    PICKLE_PROTOCOL = 2
+    _pickleLoad = pickle.load
 
-def savePickle(obj, dir_path, file_name):
+else:
+    PICKLE_PROTOCOL = min(pickle.HIGHEST_PROTOCOL, 5)
+    _pickleLoad = functools.partial(pickle.load, encoding='latin1')
+
+# Buffer size for reading and writing pickle files (bytes), larger than the default to reduce the number of
+#   system calls for large trajectory pickles
+PICKLE_BUFFER_SIZE = 1 << 20
+
+# Compression used when saving with the joblib backend
+JOBLIB_COMPRESS = ('lz4', 3)
+
+
+
+def _checkBackend(backend):
+    """ Check that the given serialization backend is known. """
+
+    if backend not in ('pickle', 'joblib'):
+        raise ValueError("Unknown pickle backend '{:s}', use 'pickle' or 'joblib'!".format(backend))
+
+
+
+def _importJoblib():
+    """ Import joblib for the 'joblib' backend. It is only imported when the backend is used, so importing
+        this module does not pay for it. The LZ4 compression also requires the lz4 package.
+
+    Return:
+        joblib: [module] The joblib module.
+    """
+
+    try:
+        import joblib
+        import lz4
+
+    except ImportError:
+        raise ImportError("The joblib and lz4 packages are required for the 'joblib' pickle backend!")
+
+    return joblib
+
+
+
+def savePickle(obj, dir_path, file_name, backend='pickle'):
     """ Dump the given object into a file using Python 'pickling'. The file can be loaded into Python
         ('unpickled') afterwards for further use.
 
@@ -20,57 +68,91 @@ def savePickle(obj, dir_path, file_name):
         dir_path: [str] Path of the directory where the pickle file will be stored.
         file_name: [str] Name of the file where the object will be stored.
 
+    Keyword arguments:
+        backend: [str] 'pickle' (default) writes a plain pickle file. 'joblib' writes an LZ4 compressed
+            joblib file (requires joblib and lz4), which is smaller for objects dominated by numpy arrays. It
+            has to be loaded with the same backend.
+
     """
 
+    _checkBackend(backend)
+
+    if backend == 'joblib':
+
+        # Check that joblib and lz4 are available before anything is created on disk
+        joblib = _importJoblib()
+
+        mkdirP(dir_path)
+
+        joblib.dump(obj, os.path.join(dir_path, file_name), compress=JOBLIB_COMPRESS,
+            protocol=PICKLE_PROTOCOL)
+        return
+
     mkdirP(dir_path)
 
-    with open(os.path.join(dir_path, file_name), 'wb') as f:
-        pickle.dump(obj, f, protocol=2)
+    with open(os.path.join(dir_path, file_name), 'wb', buffering=PICKLE_BUFFER_SIZE) as f:
+        pickle.dump(obj, f, protocol=PICKLE_PROTOCOL)
 
 
 
-def loadPickle(dir_path, file_name):
+def loadPickle(dir_path, file_name, backend='pickle'):
     """ Loads pickle file.
 	
 	Arguments:
 		dir_path: [str] Path of the directory where the pickle file will be stored.
         file_name: [str] Name of the file where the object will be stored.
 
+    Keyword arguments:
+        backend: [str] 'pickle' (default) or 'joblib', the backend the file was saved with (see savePickle).
+
     """
 
-    with open(os.path.join(dir_path, file_name), 'rb') as f:
+    _checkBackend(backend)
+
+    if backend == 'joblib':
+        return _importJoblib().load(os.path.join(dir_path, file_name))
+
+    with open(os.path.join(dir_path, file_name), 'rb', buffering=PICKLE_BUFFER_SIZE) as f:
 
-        # Python 2
-        if sys.version_info[0] < 3:
-            p = pickle.load(f)
+        p = _pickleLoad(f)
 
-        # Python 3
-        else:
-            p = pickle.load(f, encoding='latin1')
+    # Trajectory and Orbit objects fix their attributes saved by older versions during unpickling
+    #   (see their __setstate__), other objects with the same attributes are fixed here
 
+    # Fix attribute compatibility with the old typo "uncertanties"
+    if hasattr(p, "uncertainties") and not hasattr(p, "uncertanties"):
+        p.uncertanties = p.uncertainties
 
-        # Fix attribute compatibility in trajectory objects with older versions which had a 
-        #   typo "uncertanties"
-        if hasattr(p, "uncertainties"):
-            p.uncertanties = p.uncertainties
+    elif hasattr(p, "uncertanties") and not hasattr(p, "uncertainties"):
+        p.uncertainties = p.uncertanties
 
-        if hasattr(p, "uncertanties"):
-            p.uncertainties = p.uncertanties
+    # Add the parameters missing in old trajectory-like objects (e.g. simulated meteors)
+    if hasattr(p, "orbit") and hasattr(p, "observations"):
 
-        # Check if the pickle file is a trajectory file
-        if hasattr(p, 'orbit') and hasattr(p, 'observations'):
+        if not hasattr(p, "gravity_factor"):
+            p.gravity_factor = 1.0
 
-            # If there is no orbit object, create one
-            if p.orbit is not None:
-                p.orbit.fixMissingParameters()
+        if not hasattr(p, "v0z"):
+            p.v0z = 0.0
 
-            # If the gravity factor is missing, add it
-            if not hasattr(p, 'gravity_factor'):
-                p.gravity_factor = 1.0
 
-            # If v0z is missing, add it
-            if not hasattr(p, 'v0z'):
-                p.v0z = 0.0
-                
+    return p
+
+
+
+def loadPickleBatch(file_list, cores=None, backend='pickle'):
+    """ Loads a list of pickle files in parallel, e.g. when scanning a large number of trajectory pickles.
+
+    Arguments:
+        file_list: [list] A list of (dir_path, file_name) tuples, as given to loadPickle.
+
+    Keyword arguments:
+        cores: [int] Number of parallel processes. None by default, in which case all available cores will be
+            used. If 1, the files are loaded sequentially without multiprocessing.
+        backend: [str] 'pickle' (default) or 'joblib', the backend the files were saved with (see savePickle).
+
+    Return:
+        [list] A list of loaded objects, in the same order as file_list.
+    """
 
-        return p
+    return domainParallelizer(file_list, loadPickle, cores=cores, kwarg_dict={'backend': backend})
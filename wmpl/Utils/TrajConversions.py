@@ -561,8 +561,121 @@ def geo2Cartesian(lat_rad, lon_rad, h, julian_date, precess_j2000=False):
         return x, y, z
 
 
-# Vectorize the geo2Cartesian function, so julian_date can be given as a numpy array
-geo2Cartesian_vect = np.vectorize(geo2Cartesian, excluded=['lat_rad', 'lon_rad', 'h'])
+# Vectorize the geo2Cartesian function, so all arguments can be given as numpy arrays
+_geo2Cartesian_vect = np.vectorize(geo2Cartesian, excluded=['lat_rad', 'lon_rad', 'h'])
+
+
+def geo2Cartesian_vect(lat_rad, lon_rad, h, julian_date, precess_j2000=False):
+    """ Vectorized version of geo2Cartesian, so julian_date can be given as a numpy array. As the position of
+        the observer is fixed, the WGS84 height and the ECEF coordinates are only computed once and only the
+        sidereal time is evaluated for every Julian date.
+    
+    Arguments:
+        lat_rad: [float] Latitude of the observer in radians (+N), WGS84.
+        lon_rad: [float] Longitde of the observer in radians (+E), WGS84.
+        h: [int or float] Elevation of the observer in meters (EGS96 convention).
+        julian_date: [float or ndarray] Julian date(s), epoch J2000.0.
+
+    Keyword arguments:
+        precess_j2000: [bool] Precess ECI coordinates to J2000. False by default.
+    
+    Return:
+        (x, y, z): [tuple of ndarrays] a tuple of X, Y, Z Cartesian ECI coordinates
+        
+    """
+
+    # Fall back to evaluating every point separately if the observer is moving or the precession is needed
+    if precess_j2000 or np.ndim(lat_rad) or np.ndim(lon_rad) or np.ndim(h):
+        return _geo2Cartesian_vect(lat_rad, lon_rad, h, julian_date, precess_j2000=precess_j2000)
+
+
+    lat_rad = float(lat_rad)
+    lon_rad = float(lon_rad)
+    julian_date = np.asarray(julian_date, dtype=np.float64)
+
+    lon = np.degrees(lon_rad)
+
+
+    # Convert MSL height (i.e. height above sea level) to WGS84 height
+    h = wmpl.Utils.GeoidHeightEGM96.mslToWGS84Height(lat_rad, lon_rad, float(h))
+
+
+    # Calculate ECEF coordinates
+    ecef_x, ecef_y, ecef_z = latLonAlt2ECEF(lat_rad, lon_rad, h)
+
+
+    # Get Local Sidereal Time (apparent) for every Julian date
+    LST_rad = np.radians(np.array([jd2LST(jd, lon)[0] for jd in julian_date.ravel()], \
+        dtype=np.float64).reshape(julian_date.shape))
+
+
+    # Calculate the Earth radius at given latitude
+    Rh = math.sqrt(ecef_x**2 + ecef_y**2 + ecef_z**2)
+
+    # Calculate the geocentric latitude (latitude which considers the Earth as an elipsoid)
+    lat_geocentric = math.atan2(ecef_z, math.sqrt(ecef_x**2 + ecef_y**2))
+
+    # Calculate Cartesian ECI coordinates (in meters), in the epoch of date
+    x = Rh*np.cos(lat_geocentric)*np.cos(LST_rad)
+    y = Rh*np.cos(lat_geocentric)*np.sin(LST_rad)
+    z = Rh*np.sin(lat_geocentric)*np.ones_like(LST_rad)
+
+
+    return x, y, z
+
+
+def geo2CartesianBatch(lat_rad, lon_rad, h, julian_date):
+    """ Batch version of geo2Cartesian for moving points, i.e. when latitudes, longitudes, heights and Julian
+        dates are all given as arrays of the same length. The geoid heights, ECEF coordinates and the final
+        ECI coordinates are computed with vectorized numpy operations, only the sidereal time is evaluated
+        point by point.
+    
+    Arguments:
+        lat_rad: [ndarray] Latitudes in radians (+N), WGS84.
+        lon_rad: [ndarray] Longitudes in radians (+E), WGS84.
+        h: [ndarray] Elevations in meters (EGS96 convention).
+        julian_date: [ndarray] Julian dates, epoch J2000.0.
+    
+    Return:
+        (x, y, z): [tuple of ndarrays] a tuple of X, Y, Z Cartesian ECI coordinates (epoch of date)
+        
+    """
+
+    lat_rad = np.asarray(lat_rad, dtype=np.float64)
+    lon_rad = np.asarray(lon_rad, dtype=np.float64)
+    julian_date = np.asarray(julian_date, dtype=np.float64)
+
+    lon = np.degrees(lon_rad)
+
+
+    # Convert MSL height (i.e. height above sea level) to WGS84 height
+    h = wmpl.Utils.GeoidHeightEGM96.mslToWGS84Height_vect(lat_rad, lon_rad, np.asarray(h, dtype=np.float64))
+
+
+    # Calculate ECEF coordinates
+    N = EARTH.EQUATORIAL_RADIUS/np.sqrt(1.0 - (EARTH.E**2)*np.sin(lat_rad)**2)
+    ecef_x = (N + h)*np.cos(lat_rad)*np.cos(lon_rad)
+    ecef_y = (N + h)*np.cos(lat_rad)*np.sin(lon_rad)
+    ecef_z = ((1 - EARTH.E**2)*N + h)*np.sin(lat_rad)
+
+
+    # Get Local Sidereal Time (apparent) for every point
+    LST_rad = np.radians(np.array([jd2LST(jd, ln)[0] for jd, ln in zip(julian_date, lon)], dtype=np.float64))
+
+
+    # Calculate the Earth radius at given latitude
+    Rh = np.sqrt(ecef_x**2 + ecef_y**2 + ecef_z**2)
+
+    # Calculate the geocentric latitude (latitude which considers the Earth as an elipsoid)
+    lat_geocentric = np.arctan2(ecef_z, np.sqrt(ecef_x**2 + ecef_y**2))
+
+    # Calculate Cartesian ECI coordinates (in meters), in the epoch of date
+    x = Rh*np.cos(lat_geocentric)*np.cos(LST_rad)
+    y = Rh*np.cos(lat_geocentric)*np.sin(LST_rad)
+    z = Rh*np.sin(lat_geocentric)
+
+
+    return x, y, z
 
 
 # # DAVE's CLARK EQs